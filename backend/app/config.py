@@ -5,11 +5,14 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     ANTHROPIC_API_KEY: str = ""
+    CLAUDE_CONCURRENCY: int = 4
+    CLAUDE_TPM: int = 0  # tokens-per-minute budget; 0 disables throttling
     BRAVE_API_KEY: str = ""
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_ROLE_KEY: str = ""
     GEMINI_API_KEY: str = ""
+    GEMINI_CONCURRENCY: int = 8
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     CORS_ORIGINS: str = "http://localhost:5173"
@@ -1,6 +1,8 @@
+import asyncio
 import logging
 from datetime import datetime
 
+import httpx
 from supabase import Client, create_client
 
 from app.config import get_settings
@@ -26,6 +28,9 @@ class SupabaseDB:
             )
         else:
             self._storage_client = self._client
+        self._storage_key = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_KEY
+        self._http: httpx.AsyncClient | None = None
+        self._images_bucket_ready = False
         logger.info("Supabase DB client initialized")
 
     # ── Project methods ──────────────────────────────────────────────
@@ -76,6 +81,16 @@ class SupabaseDB:
         result = query.execute()
         return [Artifact(**row) for row in result.data]
 
+    async def get_artifact(self, project_id: str, artifact_id: str) -> Artifact | None:
+        result = (
+            self._client.table("artifacts").select("*")
+            .eq("project_id", project_id).eq("id", artifact_id)
+            .execute()
+        )
+        if result.data:
+            return Artifact(**result.data[0])
+        return None
+
     async def update_artifact(self, artifact_id: str, updates: dict) -> Artifact | None:
         result = self._client.table("artifacts").update(updates).eq("id", artifact_id).execute()
         if result.data:
@@ -104,6 +119,17 @@ class SupabaseDB:
             logger.error("Failed to update image for artifact=%s", artifact_id, exc_info=True)
             return False
 
+    async def bulk_update_artifact_images(self, image_urls: dict[str, str]) -> bool:
+        """Set image_url for many artifacts in a single UPDATE (via RPC)."""
+        try:
+            self._client.rpc("bulk_update_artifact_images", {
+                "updates": [{"id": aid, "image_url": url} for aid, url in image_urls.items()],
+            }).execute()
+            return True
+        except Exception:
+            logger.error("Failed to bulk update images for %d artifacts", len(image_urls), exc_info=True)
+            return False
+
     # ── Connection methods ───────────────────────────────────────────
 
     async def create_connection(self, conn: ArtifactConnection) -> ArtifactConnection:
@@ -172,6 +198,30 @@ class SupabaseDB:
             {"status": "addressed"}
         ).eq("artifact_id", artifact_id).eq("status", "pending").execute()
 
+    # ── Image cache methods ───────────────────────────────────────
+
+    async def get_cached_image(self, prompt_hash: str) -> str | None:
+        try:
+            result = (
+                self._client.table("image_cache")
+                .select("image_url")
+                .eq("prompt_hash", prompt_hash)
+                .limit(1)
+                .execute()
+            )
+        except Exception:
+            logger.warning("Image cache lookup failed for %s", prompt_hash, exc_info=True)
+            return None
+        return result.data[0]["image_url"] if result.data else None
+
+    async def put_cached_image(self, prompt_hash: str, image_url: str) -> None:
+        try:
+            self._client.table("image_cache").upsert(
+                {"prompt_hash": prompt_hash, "image_url": image_url}
+            ).execute()
+        except Exception:
+            logger.warning("Failed to cache image for %s", prompt_hash, exc_info=True)
+
     # ── Storage methods ───────────────────────────────────────────
 
     def ensure_video_bucket(self) -> None:
@@ -218,6 +268,41 @@ class SupabaseDB:
         )
         return bucket.get_public_url(destination)
 
+    def get_image_public_url(self, destination: str) -> str:
+        """Public URL for a path in the 'images' bucket (computed locally, no request)."""
+        return self._storage_client.storage.from_("images").get_public_url(destination)
+
+    async def upload_image_async(
+        self, image_bytes: bytes, destination: str, content_type: str = "image/jpeg"
+    ) -> str:
+        """Upload image bytes through the Storage REST API on a shared async client.
+
+        Avoids a thread hop per upload, and the bytes go into the request body
+        as-is rather than through the sync client's file handling.
+        """
+        if not self._images_bucket_ready:
+            await asyncio.to_thread(self.ensure_images_bucket)
+            self._images_bucket_ready = True
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=get_settings().SUPABASE_URL,
+                headers={"apikey": self._storage_key, "Authorization": f"Bearer {self._storage_key}"},
+                timeout=httpx.Timeout(60.0, connect=10.0),
+            )
+        resp = await self._http.post(
+            f"/storage/v1/object/images/{destination}",
+            content=image_bytes,
+            headers={"content-type": content_type, "x-upsert": "true"},
+        )
+        resp.raise_for_status()
+        return self.get_image_public_url(destination)
+
+    async def close(self) -> None:
+        """Close the async storage HTTP client (called on app shutdown)."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
     def upload_video(self, file_path: str, destination: str) -> str:
         """Upload an MP4 to the 'videos' bucket, return its public URL."""
         bucket = self._storage_client.storage.from_("videos")
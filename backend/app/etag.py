@@ -0,0 +1,35 @@
+"""Conditional GET support: ETags on JSON responses, 304 on a matching If-None-Match."""
+
+import hashlib
+
+from fastapi import Request, Response
+
+# Headers that describe the body and must not accompany a 304
+_BODY_HEADERS = {"content-length", "content-type"}
+
+
+async def etag_middleware(request: Request, call_next):
+    """Tag successful JSON GET responses with a content hash.
+
+    The route still runs, but a client whose cached copy is current gets an
+    empty 304 instead of the full body to download and parse again.
+    """
+    response = await call_next(request)
+    if (
+        request.method != "GET"
+        or response.status_code != 200
+        or not response.headers.get("content-type", "").startswith("application/json")
+    ):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    headers["etag"] = etag
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(
+            status_code=304,
+            headers={k: v for k, v in headers.items() if k not in _BODY_HEADERS},
+        )
+    return Response(content=body, status_code=200, headers=headers)
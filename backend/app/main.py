@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
+from app.etag import etag_middleware
 from app.routers import artifacts, auth, feedback, plan, projects, research, video, export, plan_directions
 from app.ws.handlers import handle_project_ws
 from app.ws.manager import get_ws_manager
@@ -25,6 +26,12 @@ async def lifespan(app: FastAPI):
     db.ensure_video_bucket()
     yield
     logger.info("MVP backend shutting down")
+    from app.services import claude_service, image_service, web_fetch, web_search
+    await claude_service.close_client()
+    await image_service.close_client()
+    await web_fetch.close_client()
+    await web_search.close_client()
+    await db.close()
 
 
 app = FastAPI(title="Maximum Virtual Product", version="0.1.0", lifespan=lifespan)
@@ -36,7 +43,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+app.middleware("http")(etag_middleware)
 
 app.include_router(auth.router)
 app.include_router(projects.router)
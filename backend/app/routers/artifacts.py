@@ -12,6 +12,15 @@ async def list_artifacts(project_id: str, phase: str | None = None):
     return await db.get_artifacts(project_id, phase)
 
 
+@router.get("/projects/{project_id}/artifacts/{artifact_id}", response_model=Artifact)
+async def get_artifact(project_id: str, artifact_id: str):
+    db = get_db()
+    artifact = await db.get_artifact(project_id, artifact_id)
+    if not artifact:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return artifact
+
+
 @router.patch("/artifacts/{artifact_id}", response_model=Artifact)
 async def update_artifact(artifact_id: str, data: ArtifactUpdate):
     db = get_db()
@@ -1,7 +1,7 @@
 """Router for project export (implementation-ready markdown)."""
 
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 from app.services.export_service import export_project_markdown
 
@@ -21,4 +21,4 @@ async def export_project(
     if format == "text":
         return PlainTextResponse(markdown)
 
-    return {"markdown": markdown, "project_id": project_id}
+    return ORJSONResponse({"markdown": markdown, "project_id": project_id})
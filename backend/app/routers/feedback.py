@@ -1,4 +1,3 @@
-import asyncio
 import logging
 from collections import defaultdict
 
@@ -66,24 +65,41 @@ async def _regenerate_artifact_task(
     artifact,
     pending_feedback: list[Feedback],
 ):
-    db = get_db()
-    ws_manager = get_ws_manager()
-
-    feedback_items = [
-        {"comment": f.comment, "bounds": f.bounds}
-        for f in pending_feedback
-    ]
+    feedback_items = _feedback_items(pending_feedback)
     artifact_dict = artifact.model_dump()
 
     # Call Claude to regenerate
     logger.info("Regeneration requested for artifact=%s", artifact_id)
     result = await claude_service.regenerate_artifact(artifact_dict, feedback_items)
+    await _apply_regeneration(project_id, artifact_id, artifact, result)
+
+
+def _feedback_items(pending_feedback: list[Feedback]) -> list[dict]:
+    return [
+        {"comment": f.comment, "bounds": f.bounds}
+        for f in pending_feedback
+    ]
+
+
+async def _apply_regeneration(
+    project_id: str,
+    artifact_id: str,
+    artifact,
+    result: dict | None,
+) -> bool:
+    """Persist a regeneration result, broadcast it, and refresh the artifact image.
+
+    Returns False if there was no result or it could not be saved.
+    """
+    db = get_db()
+    ws_manager = get_ws_manager()
+
     if not result:
         logger.error("Regeneration Claude call failed for artifact=%s", artifact_id)
         await ws_manager.send_event(project_id, "error", {
             "message": f"Failed to regenerate artifact {artifact_id}",
         })
-        return
+        return False
 
     # Update artifact in DB
     updates = {
@@ -97,7 +113,7 @@ async def _regenerate_artifact_task(
         await ws_manager.send_event(project_id, "error", {
             "message": f"Failed to save regenerated artifact {artifact_id}",
         })
-        return
+        return False
 
     # Mark feedback as addressed
     await db.mark_feedback_addressed(artifact_id)
@@ -111,11 +127,10 @@ async def _regenerate_artifact_task(
     })
     logger.info("Regeneration complete for artifact=%s", artifact_id)
 
-    # Generate new image
+    # Generate new image; bypass the prompt cache, since an unchanged
+    # title/summary would otherwise hand back the old image
     updated_dict = updated.model_dump()
-    image_url = await image_service.generate_artifact_image(
-        updated_dict, updated.title
-    )
+    image_url = await image_service.generate_artifact_image(updated_dict, use_cache=False)
     if image_url:
         saved = await db.update_artifact_image(artifact_id, image_url)
         if saved:
@@ -123,6 +138,7 @@ async def _regenerate_artifact_task(
                 "artifact_id": artifact_id,
                 "image_url": image_url,
             })
+    return True
 
 
 @router.post("/{project_id}/batch-regenerate")
@@ -169,42 +185,52 @@ async def _batch_regenerate_task(
     all_artifacts = await db.get_artifacts(project_id)
     artifact_map = {a.id: a for a in all_artifacts}
 
+    found: list[tuple[int, str]] = []
     for i, artifact_id in enumerate(artifact_ids):
-        artifact = artifact_map.get(artifact_id)
-        if not artifact:
-            failed += 1
-            await ws_manager.send_event(project_id, "batch_regenerate_progress", {
-                "artifact_id": artifact_id,
-                "index": i,
-                "total": total,
-                "status": "failed",
-            })
+        if artifact_id in artifact_map:
+            found.append((i, artifact_id))
             continue
+        failed += 1
+        await ws_manager.send_event(project_id, "batch_regenerate_progress", {
+            "artifact_id": artifact_id,
+            "index": i,
+            "total": total,
+            "status": "failed",
+        })
 
+    # One Claude call for every artifact in the batch
+    results: list[dict | None] = []
+    if found:
+        logger.info("Batch regeneration requested for %d artifacts", len(found))
         try:
-            await _regenerate_artifact_task(
-                project_id, artifact_id, artifact, by_artifact[artifact_id]
+            results = await claude_service.regenerate_artifacts(
+                [artifact_map[aid].model_dump() for _, aid in found],
+                [_feedback_items(by_artifact[aid]) for _, aid in found],
             )
-            succeeded += 1
-            await ws_manager.send_event(project_id, "batch_regenerate_progress", {
-                "artifact_id": artifact_id,
-                "index": i,
-                "total": total,
-                "status": "complete",
-            })
         except Exception:
-            logger.exception("Batch regenerate failed for artifact=%s", artifact_id)
+            logger.exception("Batch regenerate Claude call failed for project=%s", project_id)
+            results = [None] * len(found)
+
+    for (i, artifact_id), result in zip(found, results):
+        status = "failed"
+        if result:
+            try:
+                if await _apply_regeneration(
+                    project_id, artifact_id, artifact_map[artifact_id], result
+                ):
+                    status = "complete"
+            except Exception:
+                logger.exception("Batch regenerate failed for artifact=%s", artifact_id)
+        if status == "complete":
+            succeeded += 1
+        else:
             failed += 1
-            await ws_manager.send_event(project_id, "batch_regenerate_progress", {
-                "artifact_id": artifact_id,
-                "index": i,
-                "total": total,
-                "status": "failed",
-            })
-
-        # Small delay between artifacts to avoid rate limits
-        if i < total - 1:
-            await asyncio.sleep(1)
+        await ws_manager.send_event(project_id, "batch_regenerate_progress", {
+            "artifact_id": artifact_id,
+            "index": i,
+            "total": total,
+            "status": status,
+        })
 
     await ws_manager.send_event(project_id, "batch_regenerate_complete", {
         "total": total,
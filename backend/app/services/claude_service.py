@@ -1,62 +1,130 @@
 """Claude Opus 4.6 streaming wrapper for research and planning."""
 
+import asyncio
+import io
+import itertools
 import json
 import logging
+import random
 import re
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
 
 import anthropic
+import httpx
+import orjson
+from anthropic.types import TextBlock
 from app.config import get_settings
+from app.services.result_cache import TTLCache, cache_key
+from app.services.token_budget import TokenBudgetTracker
 
 logger = logging.getLogger(__name__)
 
+# Responses longer than this are parsed in a worker thread so the regex scan
+# and json.loads don't stall the event loop.
+PARSE_OFFLOAD_CHARS = 64 * 1024
 
-def get_client() -> anthropic.Anthropic:
-    settings = get_settings()
-    return anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+# Token budget for artifact lists embedded in synthesis/plan prompts, so input
+# size (and TTFT) stays bounded regardless of how many artifacts a run produced.
+MAX_ARTIFACTS_TOKENS = 8000
 
+# Shared transport: concurrent research angles multiplex over one HTTP/2
+# connection instead of each call paying its own TLS handshake.
+_http_client: httpx.AsyncClient | None = None
+_client: anthropic.AsyncAnthropic | None = None
 
-async def generate_clarifying_questions(query: str, description: str = "") -> dict:
-    """Generate 2-3 clarifying questions with options and a suggested project name.
+# Dead-man timeout for streamed calls: abort if no event arrives for this long,
+# instead of waiting out the SDK's 600s blanket request timeout.
+STREAM_IDLE_TIMEOUT = 30.0
 
-    Returns: {questions: [{question, options}], suggested_name: str}
+# Bounds concurrent Claude research turns (RPM). The SDK's own retries are
+# disabled; _with_retry owns backoff so it composes with the semaphore.
+_claude_semaphore = asyncio.Semaphore(get_settings().CLAUDE_CONCURRENCY or 4)
+RATE_LIMIT_RETRIES = 3
+
+# Rolling tokens-per-minute budget shared by every Claude call (0 = unlimited).
+_tpm_tracker = TokenBudgetTracker(get_settings().CLAUDE_TPM)
+
+T = TypeVar("T")
+
+# Exact-match caches for repeated prompts (dev reloads, retries). Only
+# successfully parsed results are stored.
+_plan_research_cache = TTLCache(maxsize=512)
+_regenerate_cache = TTLCache(maxsize=512)
+
+
+def get_client() -> anthropic.AsyncAnthropic:
+    global _http_client, _client
+    if _client is None:
+        settings = get_settings()
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+            timeout=httpx.Timeout(600.0, connect=10.0),
+        )
+        _client = anthropic.AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY, http_client=_http_client, max_retries=0
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP transport (called on app shutdown)."""
+    global _http_client, _client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _client = None
+
+
+def _cached_prompt(instructions: str, details: str) -> list[dict]:
+    """Build user content with the static instructions as a cacheable prefix.
+
+    The instructions must be byte-identical across calls for the prompt cache
+    to hit, so per-call inputs only ever go in the trailing details block.
     """
-    client = get_client()
+    return [
+        {"type": "text", "text": instructions, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": details},
+    ]
 
-    description_block = ""
-    if description:
-        description_block = f'\nDescription of what the user wants to build: "{description}"\n'
 
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=4000,
-        thinking={"type": "adaptive"},
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are a research planning assistant. Given a topic and what the user wants to build, generate 2-3 clarifying questions that will help focus the research.
+CLARIFY_INSTRUCTIONS = """You are a research planning assistant. Given a topic and what the user wants to build, generate 2-3 clarifying questions that will help focus the research.
 
-Topic: "{query}"
-{description_block}
 Each question should help narrow the research scope. Provide 3-4 answer options per question.
 
 Also generate a short project name (3-6 words) that captures the essence of what the user wants to build or research.
 
 Return ONLY a JSON object, no other text:
-{{
+{
   "questions": [
-    {{"question": "What is your primary goal?", "options": ["Market analysis", "Build a product", "Academic research", "Personal learning"]}},
-    {{"question": "What's your target audience?", "options": ["Consumers", "Businesses", "Developers", "Enterprise"]}}
+    {"question": "What is your primary goal?", "options": ["Market analysis", "Build a product", "Academic research", "Personal learning"]},
+    {"question": "What's your target audience?", "options": ["Consumers", "Businesses", "Developers", "Enterprise"]}
   ],
   "suggested_name": "AI Research Assistant Platform"
-}}""",
-            }
-        ],
+}"""
+
+
+async def generate_clarifying_questions(query: str, description: str = "") -> dict:
+    """Generate 2-3 clarifying questions with options and a suggested project name.
+
+    Returns: {questions: [{question, options}], suggested_name: str}
+    """
+
+    description_block = ""
+    if description:
+        description_block = f'\nDescription of what the user wants to build: "{description}"\n'
+
+    response = await _claude_call(
+        _cached_prompt(CLARIFY_INSTRUCTIONS, f"""Topic: "{query}"
+{description_block}"""),
+        max_tokens=2000,
     )
 
     text = _extract_text(response)
 
     try:
-        result = _parse_json_object(text)
+        result = await _parse_json(_parse_json_object, text)
         if "questions" in result and "suggested_name" in result:
             return result
         # Handle case where only questions array is returned
@@ -76,6 +144,23 @@ Return ONLY a JSON object, no other text:
         }
 
 
+PLAN_CLARIFY_INSTRUCTIONS = """You are a product planning assistant. Based on the selected direction and research findings, generate 2-3 clarifying questions that will help create a better product blueprint.
+
+Ask questions about:
+- Preferred tech stack or implementation approach
+- MVP scope vs full product scope
+- Target users and their primary needs
+- Key priorities (speed to market, scalability, UX quality, etc.)
+
+Each question should have 3-4 answer options. Return ONLY a JSON object:
+{
+  "questions": [
+    {"question": "What tech stack do you prefer?", "options": ["React + Node.js", "Next.js full-stack", "Python + React", "No preference"]},
+    {"question": "What scope should this plan cover?", "options": ["MVP / proof of concept", "Full product v1", "Enterprise-grade system"]}
+  ]
+}"""
+
+
 async def generate_plan_clarifying_questions(
     direction: dict, research_artifacts: list[dict], project_description: str = ""
 ) -> dict:
@@ -83,7 +168,6 @@ async def generate_plan_clarifying_questions(
 
     Returns: {questions: [{question, options}]}
     """
-    client = get_client()
 
     direction_block = ""
     if direction:
@@ -102,39 +186,17 @@ async def generate_plan_clarifying_questions(
         for a in research_artifacts[:15]
     )
 
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=4000,
-        thinking={"type": "adaptive"},
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are a product planning assistant. Based on the selected direction and research findings, generate 2-3 clarifying questions that will help create a better product blueprint.
-{direction_block}{description_block}
+    response = await _claude_call(
+        _cached_prompt(PLAN_CLARIFY_INSTRUCTIONS, f"""{direction_block}{description_block}
 Research findings:
-{artifact_summaries}
-
-Ask questions about:
-- Preferred tech stack or implementation approach
-- MVP scope vs full product scope
-- Target users and their primary needs
-- Key priorities (speed to market, scalability, UX quality, etc.)
-
-Each question should have 3-4 answer options. Return ONLY a JSON object:
-{{
-  "questions": [
-    {{"question": "What tech stack do you prefer?", "options": ["React + Node.js", "Next.js full-stack", "Python + React", "No preference"]}},
-    {{"question": "What scope should this plan cover?", "options": ["MVP / proof of concept", "Full product v1", "Enterprise-grade system"]}}
-  ]
-}}""",
-            }
-        ],
+{artifact_summaries}"""),
+        max_tokens=2000,
     )
 
     text = _extract_text(response)
 
     try:
-        result = _parse_json_object(text)
+        result = await _parse_json(_parse_json_object, text)
         if "questions" in result:
             return result
         raise ValueError("Missing questions key")
@@ -153,12 +215,23 @@ Each question should have 3-4 answer options. Return ONLY a JSON object:
         }
 
 
+PLAN_DIRECTIONS_INSTRUCTIONS = """You are a product strategist. Based on the research findings provided, suggest 2-3 distinct plan directions the user could pursue.
+
+Each direction should be a different strategic approach. Return ONLY a JSON array:
+[
+  {
+    "title": "Short direction title (3-6 words)",
+    "description": "2-3 sentence description of this direction and what it would involve",
+    "key_focus": "The primary focus area in 5-10 words"
+  }
+]"""
+
+
 async def suggest_plan_directions(query: str, context: dict, artifacts: list[dict]) -> list[dict]:
     """Suggest 2-3 plan directions based on research findings.
 
     Returns: [{title: str, description: str, key_focus: str}, ...]
     """
-    client = get_client()
 
     context_str = ""
     if context:
@@ -166,42 +239,24 @@ async def suggest_plan_directions(query: str, context: dict, artifacts: list[dic
             f"- {k}: {v}" for k, v in context.items()
         )
 
-    artifact_summaries = "\n".join(
-        f"- [{a.get('type', '')}] {a.get('title', '')}: {a.get('summary', '')}"
-        for a in artifacts[:20]
+    artifact_summaries = _budget_artifact_lines(
+        artifacts,
+        _typed_artifact_line,
     )
 
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=4000,
-        thinking={"type": "adaptive"},
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are a product strategist. Based on the research findings below, suggest 2-3 distinct plan directions the user could pursue.
-
-Original topic: "{query}"
+    response = await _claude_call(
+        _cached_prompt(PLAN_DIRECTIONS_INSTRUCTIONS, f"""Original topic: "{query}"
 {context_str}
 
 Research findings:
-{artifact_summaries}
-
-Each direction should be a different strategic approach. Return ONLY a JSON array:
-[
-  {{
-    "title": "Short direction title (3-6 words)",
-    "description": "2-3 sentence description of this direction and what it would involve",
-    "key_focus": "The primary focus area in 5-10 words"
-  }}
-]""",
-            }
-        ],
+{artifact_summaries}"""),
+        max_tokens=3000,
     )
 
     text = _extract_text(response)
 
     try:
-        directions = _parse_json_array(text)
+        directions = await _parse_json(_parse_json_array, text)
         return directions
     except (json.JSONDecodeError, AttributeError):
         return [
@@ -213,6 +268,36 @@ Each direction should be a different strategic approach. Return ONLY a JSON arra
         ]
 
 
+DESIGN_DIMENSIONS_INSTRUCTIONS = """You are a product design consultant. Based on the product direction and research, generate exactly 5 design preference dimensions.
+
+Each dimension presents TWO contrasting visual/UX approaches for THIS specific product. Make them specific to the product, not generic.
+
+For each dimension, create two options with detailed image prompts that Gemini can use to generate UI mockup screenshots.
+
+Return ONLY a JSON array of 5 objects:
+[
+  {
+    "dimension_id": "dim_1",
+    "dimension_name": "Color Scheme",
+    "description": "Overall color palette and mood",
+    "option_a": {
+      "option_id": "dim_1_a",
+      "label": "Dark & Moody",
+      "description": "Deep navy/charcoal palette with neon accents",
+      "image_prompt": "High-fidelity UI mockup screenshot of a [product type] app with dark navy background, neon cyan accents, modern sans-serif typography, showing the main dashboard view. Clean, professional design. No watermarks."
+    },
+    "option_b": {
+      "option_id": "dim_1_b",
+      "label": "Light & Clean",
+      "description": "White/cream palette with subtle color accents",
+      "image_prompt": "High-fidelity UI mockup screenshot of a [product type] app with white/cream background, soft blue accents, clean typography, showing the main dashboard view. Minimal, airy design. No watermarks."
+    }
+  }
+]
+
+Make all 5 dimensions different aspects: color scheme, layout style, typography/density, visual elements, component style. Tailor image prompts to this specific product."""
+
+
 async def generate_design_preference_dimensions(
     direction: dict, research_artifacts: list[dict], project_description: str = ""
 ) -> list[dict]:
@@ -221,7 +306,6 @@ async def generate_design_preference_dimensions(
     Each dimension has two options with image prompts for Gemini.
     Returns: [{dimension_id, dimension_name, description, option_a: {option_id, label, description, image_prompt}, option_b: {...}}, ...]
     """
-    client = get_client()
 
     direction_block = ""
     if direction:
@@ -239,52 +323,17 @@ async def generate_design_preference_dimensions(
         for a in research_artifacts[:10]
     )
 
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=6000,
-        thinking={"type": "adaptive"},
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are a product design consultant. Based on the product direction and research, generate exactly 5 design preference dimensions.
-
-Each dimension presents TWO contrasting visual/UX approaches for THIS specific product. Make them specific to the product, not generic.
-{direction_block}{description_block}
+    response = await _claude_call(
+        _cached_prompt(DESIGN_DIMENSIONS_INSTRUCTIONS, f"""{direction_block}{description_block}
 Research findings:
-{artifact_summaries}
-
-For each dimension, create two options with detailed image prompts that Gemini can use to generate UI mockup screenshots.
-
-Return ONLY a JSON array of 5 objects:
-[
-  {{
-    "dimension_id": "dim_1",
-    "dimension_name": "Color Scheme",
-    "description": "Overall color palette and mood",
-    "option_a": {{
-      "option_id": "dim_1_a",
-      "label": "Dark & Moody",
-      "description": "Deep navy/charcoal palette with neon accents",
-      "image_prompt": "High-fidelity UI mockup screenshot of a [product type] app with dark navy background, neon cyan accents, modern sans-serif typography, showing the main dashboard view. Clean, professional design. No watermarks."
-    }},
-    "option_b": {{
-      "option_id": "dim_1_b",
-      "label": "Light & Clean",
-      "description": "White/cream palette with subtle color accents",
-      "image_prompt": "High-fidelity UI mockup screenshot of a [product type] app with white/cream background, soft blue accents, clean typography, showing the main dashboard view. Minimal, airy design. No watermarks."
-    }}
-  }}
-]
-
-Make all 5 dimensions different aspects: color scheme, layout style, typography/density, visual elements, component style. Tailor image prompts to this specific product.""",
-            }
-        ],
+{artifact_summaries}"""),
+        max_tokens=4000,
     )
 
     text = _extract_text(response)
 
     try:
-        dimensions = _parse_json_array(text)
+        dimensions = await _parse_json(_parse_json_array, text)
         # Validate structure
         for dim in dimensions:
             if not all(k in dim for k in ("dimension_id", "dimension_name", "option_a", "option_b")):
@@ -336,12 +385,28 @@ def _fallback_design_dimensions() -> list[dict]:
     ]
 
 
+PLAN_RESEARCH_INSTRUCTIONS = """You are a research planning assistant. Given a research query, generate exactly 4 distinct research angles to investigate in parallel.
+
+Return a JSON array of research angles. Each angle should have:
+- "angle": A short label for this research direction (2-5 words)
+- "sub_query": A specific search query to use for web search
+- "focus": What to look for in the search results (1 sentence)
+
+Return ONLY the JSON array, no other text.
+
+Example output:
+[
+  {"angle": "Direct Competitors", "sub_query": "best project management tools 2025", "focus": "Identify the top competitors and their key features"},
+  {"angle": "User Pain Points", "sub_query": "project management software complaints reviews", "focus": "Common frustrations users have with existing tools"},
+  {"angle": "Emerging Trends", "sub_query": "project management AI features trends 2025", "focus": "New technologies and approaches being adopted"}
+]"""
+
+
 async def plan_research(query: str, context: dict | None = None) -> list[dict]:
     """Use Claude to plan research angles for a query.
 
     Returns a list of dicts: [{angle: str, sub_query: str, focus: str}, ...]
     """
-    client = get_client()
 
     context_str = ""
     if context:
@@ -349,39 +414,28 @@ async def plan_research(query: str, context: dict | None = None) -> list[dict]:
             f"- {k}: {v}" for k, v in context.items()
         )
 
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=8000,
-        thinking={"type": "adaptive"},
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are a research planning assistant. Given a research query, generate exactly 4 distinct research angles to investigate in parallel.
-
-Research query: "{query}"
-{context_str}
-
-Return a JSON array of research angles. Each angle should have:
-- "angle": A short label for this research direction (2-5 words)
-- "sub_query": A specific search query to use for web search
-- "focus": What to look for in the search results (1 sentence)
-
-Return ONLY the JSON array, no other text.
-
-Example output:
-[
-  {{"angle": "Direct Competitors", "sub_query": "best project management tools 2025", "focus": "Identify the top competitors and their key features"}},
-  {{"angle": "User Pain Points", "sub_query": "project management software complaints reviews", "focus": "Common frustrations users have with existing tools"}},
-  {{"angle": "Emerging Trends", "sub_query": "project management AI features trends 2025", "focus": "New technologies and approaches being adopted"}}
-]""",
-            }
-        ],
+    # Canonical key: case/whitespace-insensitive query, order-insensitive context
+    key = cache_key(
+        " ".join(query.lower().split()),
+        repr(sorted((str(k), str(v)) for k, v in (context or {}).items())),
+    )
+    cached = _plan_research_cache.get(key)
+    if cached is not None:
+        logger.debug("plan_research cache HIT: %r", query)
+        return cached
+    logger.debug("plan_research cache MISS: %r", query)
+
+    response = await _claude_call(
+        _cached_prompt(PLAN_RESEARCH_INSTRUCTIONS, f"""Research query: "{query}"
+{context_str}"""),
+        max_tokens=2000,
     )
 
     text = _extract_text(response)
 
     try:
-        angles = _parse_json_array(text)
+        angles = await _parse_json(_parse_json_array, text)
+        _plan_research_cache.set(key, angles)
         return angles
     except (json.JSONDecodeError, AttributeError):
         return [
@@ -393,33 +447,218 @@ Example output:
         ]
 
 
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers' except
+# clauses are unchanged.
+_JSON_ARRAY_RE = re.compile(r"\[[\s\S]*\]")
+_JSON_OBJECT_RE = re.compile(r"\{[\s\S]*\}")
+
+
 def _extract_text(response) -> str:
     """Extract all text blocks from a Claude response (ignoring tool use blocks)."""
-    parts = []
-    for block in response.content:
-        if block.type == "text":
-            parts.append(block.text)
-    return "\n".join(parts)
+    content = response.content
+    if len(content) == 1 and isinstance(content[0], TextBlock):
+        return content[0].text
+    return "\n".join(b.text for b in content if isinstance(b, TextBlock))
 
 
-def _parse_json_array(text: str) -> list[dict]:
-    """Extract and parse a JSON array from text that may contain other content."""
+def _extract_json(text: str, opener: str, pattern: re.Pattern, kind: str):
+    """Slow path: strip, locate the outermost bracketed span, then parse."""
     text = text.strip()
-    if not text.startswith("["):
-        match = re.search(r"\[[\s\S]*\]", text)
+    if not text.startswith(opener):
+        if opener not in text:
+            raise json.JSONDecodeError(f"No JSON {kind} found", text, 0)
+        match = pattern.search(text)
         if match:
             text = match.group(0)
-    return json.loads(text)
+    return orjson.loads(text)
+
+
+def _parse_json_array(text: str) -> list[dict]:
+    """Extract and parse a JSON array from text that may contain other content."""
+    # Happy path: the model returned bare JSON, so skip strip() and the regex scan.
+    if text[:1] == "[" and text[-1:] == "]":
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return _extract_json(text, "[", _JSON_ARRAY_RE, "array")
 
 
 def _parse_json_object(text: str) -> dict:
     """Extract and parse a JSON object from text that may contain other content."""
-    text = text.strip()
-    if not text.startswith("{"):
-        match = re.search(r"\{[\s\S]*\}", text)
-        if match:
-            text = match.group(0)
-    return json.loads(text)
+    if text[:1] == "{" and text[-1:] == "}":
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return _extract_json(text, "{", _JSON_OBJECT_RE, "object")
+
+
+# Unbound dict.get for the per-artifact line builders below: skips the method
+# lookup on every call when formatting hundreds of artifacts.
+_get = dict.get
+
+
+def _typed_artifact_line(a: dict) -> str:
+    return "- [%s] %s: %s" % (_get(a, "type", ""), _get(a, "title", ""), _get(a, "summary", ""))
+
+
+def _synthesis_artifact_line(a: dict) -> str:
+    return "- %s: [%s] %s — %s" % (
+        _get(a, "id", "unknown"), _get(a, "type", ""), _get(a, "title", ""), _get(a, "summary", "")
+    )
+
+
+def _reference_artifact_line(a: dict) -> str:
+    return "- %s: %s — %s" % (_get(a, "id", ""), _get(a, "title", ""), _get(a, "summary", ""))
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (~4 chars per token), no API round-trip."""
+    return len(text) // 4 + 1
+
+
+def _budget_artifact_lines(
+    artifacts: list[dict],
+    format_line: Callable[[dict], str],
+    budget: int = MAX_ARTIFACTS_TOKENS,
+) -> str:
+    """Format artifacts one per line, most important first, until the token budget is spent."""
+    lines = []
+    used = 0
+    for a in sorted(artifacts, key=lambda a: a.get("importance") or 0, reverse=True):
+        line = format_line(a)
+        cost = _estimate_tokens(line)
+        if used + cost > budget:
+            logger.info("Artifact list trimmed to %d/%d items (token budget %d)", len(lines), len(artifacts), budget)
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines)
+
+
+async def _parse_json(parser, text: str):
+    """Run a JSON extraction helper inline, or off-loop for large responses."""
+    if len(text) > PARSE_OFFLOAD_CHARS:
+        return await asyncio.to_thread(parser, text)
+    return parser(text)
+
+
+RESEARCH_ANGLE_INSTRUCTIONS = """You are a research analyst. Search the web to investigate the research angle given below.
+
+Instructions:
+1. Search the web for relevant, recent information
+2. Analyze the search results thoroughly
+3. Create 1-4 structured research findings based on what you discover
+
+Each finding must be a JSON object:
+{
+  "type": "research_finding" or "competitor",
+  "title": "2-6 word title",
+  "content": "Detailed markdown content (2-4 paragraphs with specific facts, data, and insights)",
+  "summary": "1-2 sentence summary",
+  "source_url": "most relevant source URL from search results",
+  "importance": 0-100 score
+}
+
+After searching and analyzing, return ONLY a JSON array of findings as your final output, no other text."""
+
+
+def _estimate_request_tokens(messages: list[dict], max_tokens: int) -> int:
+    """Rough TPM cost of a request: prompt text at ~4 chars/token plus max_tokens."""
+    chars = 0
+    for m in messages:
+        content = m["content"]
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for block in content:
+            text = block.get("text") if isinstance(block, dict) else getattr(block, "text", None)
+            if text:
+                chars += len(text)
+    return chars // 4 + max_tokens
+
+
+def _record_usage(response, estimate: int) -> None:
+    usage = response.usage
+    _tpm_tracker.record_correction(usage.input_tokens + usage.output_tokens - estimate)
+
+
+async def _create_message(**kwargs):
+    """messages.create under the TPM budget, retried on 429s."""
+    estimate = _estimate_request_tokens(kwargs["messages"], kwargs["max_tokens"])
+    await _tpm_tracker.acquire(estimate)
+    response = await _with_retry(lambda: get_client().messages.create(**kwargs))
+    _record_usage(response, estimate)
+    return response
+
+
+async def _claude_call(content: str | list[dict], *, max_tokens: int, thinking: bool = False):
+    """Single-turn Claude request.
+
+    Adaptive thinking is opt-in: fixed-schema JSON prompts gain little from it
+    and pay for the extra tokens in latency and TPM budget.
+    """
+    kwargs: dict = {
+        "model": "claude-opus-4-6",
+        "max_tokens": max_tokens,
+        "messages": [{"role": "user", "content": content}],
+    }
+    if thinking:
+        kwargs["thinking"] = {"type": "adaptive"}
+    return await _create_message(**kwargs)
+
+
+async def _stream_message(client: anthropic.AsyncAnthropic, tools: list[dict], messages: list[dict], angle: str):
+    """Stream one research turn, failing fast if the stream goes quiet."""
+    estimate = _estimate_request_tokens(messages, 8000)
+    await _tpm_tracker.acquire(estimate)
+    async with client.messages.stream(
+        model="claude-opus-4-6",
+        max_tokens=8000,
+        tools=tools,
+        messages=messages,
+    ) as stream:
+        events = aiter(stream)
+        while True:
+            try:
+                await asyncio.wait_for(anext(events), timeout=STREAM_IDLE_TIMEOUT)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"No response activity for {STREAM_IDLE_TIMEOUT:.0f}s on angle '{angle}'"
+                ) from None
+        response = await stream.get_final_message()
+    _record_usage(response, estimate)
+    return response
+
+
+async def _with_retry(call: Callable[[], Awaitable[T]]) -> T:
+    """Await call(), retrying transient failures with jittered backoff.
+
+    Retries 429s (honoring the server's retry-after), 408/409, 5xx/overloaded
+    responses and connection errors; anything else is raised immediately.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except (anthropic.APIStatusError, anthropic.APIConnectionError) as e:
+            status = getattr(e, "status_code", None)
+            if status is not None and status not in (408, 409, 429) and status < 500:
+                raise
+            if attempt >= RATE_LIMIT_RETRIES:
+                raise
+            delay = min(2.0 * (2 ** attempt), 30.0) * (0.5 + random.random())
+            if status == 429:
+                try:
+                    delay = float(e.response.headers.get("retry-after", ""))
+                except ValueError:
+                    pass
+            attempt += 1
+            logger.warning("Claude call failed (%s), retrying in %.1fs (attempt %d)", status or type(e).__name__, delay, attempt)
+            await asyncio.sleep(delay)
 
 
 async def research_angle_with_search(sub_query: str, angle: str, focus: str) -> list[dict]:
@@ -443,60 +682,54 @@ async def research_angle_with_search(sub_query: str, angle: str, focus: str) ->
     messages = [
         {
             "role": "user",
-            "content": f"""You are a research analyst. Search the web to investigate the following research angle.
-
-Search query: "{sub_query}"
+            "content": _cached_prompt(RESEARCH_ANGLE_INSTRUCTIONS, f"""Search query: "{sub_query}"
 Research angle: "{angle}"
-Focus: {focus}
-
-Instructions:
-1. Search the web for relevant, recent information
-2. Analyze the search results thoroughly
-3. Create 1-4 structured research findings based on what you discover
-
-Each finding must be a JSON object:
-{{
-  "type": "research_finding" or "competitor",
-  "title": "2-6 word title",
-  "content": "Detailed markdown content (2-4 paragraphs with specific facts, data, and insights)",
-  "summary": "1-2 sentence summary",
-  "source_url": "most relevant source URL from search results",
-  "importance": 0-100 score
-}}
-
-After searching and analyzing, return ONLY a JSON array of findings as your final output, no other text.""",
+Focus: {focus}"""),
         }
     ]
 
     # Handle pause_turn for long-running searches
     max_continuations = 3
-    for _ in range(max_continuations + 1):
-        response = client.messages.create(
-            model="claude-opus-4-6",
-            max_tokens=8000,
-            tools=tools,
-            messages=messages,
-        )
-
-        if response.stop_reason == "pause_turn":
-            # Continue the turn — pass response back as assistant message
-            messages.append({"role": "assistant", "content": response.content})
-            messages.append({"role": "user", "content": "Continue."})
-            continue
-        break
+    async with _claude_semaphore:
+        for _ in range(max_continuations + 1):
+            response = await _with_retry(
+                lambda: _stream_message(client, tools, messages, angle)
+            )
+
+            if response.stop_reason == "pause_turn":
+                # Continue the turn — pass response back as assistant message
+                messages.append({"role": "assistant", "content": response.content})
+                messages.append({"role": "user", "content": "Continue."})
+                continue
+            break
 
     # Extract the final text (Claude's analysis after searching)
     text = _extract_text(response)
     logger.info("Research angle '%s' completed, extracting findings", angle)
 
     try:
-        findings = _parse_json_array(text)
+        findings = await _parse_json(_parse_json_array, text)
         return findings
     except (json.JSONDecodeError, AttributeError, TypeError):
         logger.warning("Failed to parse findings for angle '%s': %s", angle, text[:200])
         return []
 
 
+SUMMARIZE_FINDINGS_INSTRUCTIONS = """You are a research analyst. Analyze the web research results given below and create structured findings.
+
+Create 1-4 research findings from these sources. Each finding should be a JSON object:
+{
+  "type": "research_finding" or "competitor",
+  "title": "2-6 word title",
+  "content": "Detailed markdown content (2-4 paragraphs)",
+  "summary": "1-2 sentence summary",
+  "source_url": "most relevant source URL",
+  "importance": 0-100 score
+}
+
+Return ONLY a JSON array of findings, no other text."""
+
+
 async def summarize_findings(
     query: str, angle: str, search_results: list[dict], page_contents: list[dict]
 ) -> list[dict]:
@@ -504,83 +737,41 @@ async def summarize_findings(
 
     Kept for backward compatibility. New code uses research_angle_with_search().
     """
-    client = get_client()
-
-    context_parts = []
-    for i, (sr, pc) in enumerate(zip(search_results, page_contents)):
-        context_parts.append(
-            f"### Source {i+1}: {sr.get('title', 'Unknown')}\n"
-            f"URL: {sr.get('url', '')}\n"
-            f"Snippet: {sr.get('snippet', '')}\n"
-            f"Content:\n{pc.get('content', '[Could not fetch]')[:3000]}\n"
-        )
-
-    context = "\n---\n".join(context_parts)
 
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=8000,
-        thinking={"type": "adaptive"},
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are a research analyst. Analyze the following web research results and create structured findings.
-
-Original query: "{query}"
+    buf = io.StringIO()
+    out = buf.write
+    # zip_longest keeps every search result even if fetching came back short.
+    pairs = itertools.zip_longest(search_results, page_contents, fillvalue={})
+    for i, (sr, pc) in enumerate(pairs, 1):
+        if i > 1:
+            out("\n---\n")
+        body = (pc.get("content") or "[Could not fetch]")[:3000]
+        out(f"### Source {i}: {sr.get('title', 'Unknown')}\n")
+        out(f"URL: {sr.get('url', '')}\n")
+        out(f"Snippet: {sr.get('snippet', '')}\n")
+        out(f"Content:\n{body}\n")
+
+    context = buf.getvalue()
+
+    response = await _claude_call(
+        _cached_prompt(SUMMARIZE_FINDINGS_INSTRUCTIONS, f"""Original query: "{query}"
 Research angle: "{angle}"
 
 Sources:
-{context}
-
-Create 1-4 research findings from these sources. Each finding should be a JSON object:
-{{
-  "type": "research_finding" or "competitor",
-  "title": "2-6 word title",
-  "content": "Detailed markdown content (2-4 paragraphs)",
-  "summary": "1-2 sentence summary",
-  "source_url": "most relevant source URL",
-  "importance": 0-100 score
-}}
-
-Return ONLY a JSON array of findings, no other text.""",
-            }
-        ],
+{context}"""),
+        max_tokens=6000,
     )
 
     text = _extract_text(response)
 
     try:
-        findings = _parse_json_array(text)
+        findings = await _parse_json(_parse_json_array, text)
         return findings
     except (json.JSONDecodeError, AttributeError):
         return []
 
 
-async def synthesize_research(query: str, artifacts: list[dict]) -> dict:
-    """Use Claude to synthesize all research artifacts into groups and connections.
-
-    Returns dict with 'groups', 'connections', and 'summary' artifact.
-    """
-    client = get_client()
-
-    artifact_summaries = "\n".join(
-        f"- {a.get('id', 'unknown')}: [{a.get('type', '')}] {a.get('title', '')} — {a.get('summary', '')}"
-        for a in artifacts
-    )
-
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=8000,
-        thinking={"type": "adaptive"},
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are a research synthesizer. Given these research findings, create logical groups and identify connections between them.
-
-Original query: "{query}"
-
-Artifacts:
-{artifact_summaries}
+SYNTHESIZE_INSTRUCTIONS = """You are a research synthesizer. Given the research findings below, create logical groups and identify connections between them.
 
 Return a JSON object with:
 1. "groups": Array of groups, each with:
@@ -603,56 +794,41 @@ Return a JSON object with:
 
 3. "summary": A markdown summary (2-3 paragraphs) synthesizing all research findings
 
-Return ONLY the JSON object, no other text.""",
-            }
-        ],
+Return ONLY the JSON object, no other text."""
+
+
+async def synthesize_research(query: str, artifacts: list[dict]) -> dict:
+    """Use Claude to synthesize all research artifacts into groups and connections.
+
+    Returns dict with 'groups', 'connections', and 'summary' artifact.
+    """
+
+    artifact_summaries = _budget_artifact_lines(
+        artifacts,
+        _synthesis_artifact_line,
+    )
+
+    response = await _claude_call(
+        _cached_prompt(SYNTHESIZE_INSTRUCTIONS, f"""Original query: "{query}"
+
+Artifacts:
+{artifact_summaries}"""),
+        max_tokens=8000, thinking=True,
     )
 
     text = _extract_text(response)
 
     try:
-        result = _parse_json_object(text)
+        result = await _parse_json(_parse_json_object, text)
         return result
     except (json.JSONDecodeError, AttributeError):
         return {"groups": [], "connections": [], "summary": "Research synthesis failed."}
 
 
-async def generate_plan(
-    description: str, research_artifacts: list[dict], context: dict | None = None
-) -> dict:
-    """Use Claude to break down a project into plan components with connections.
-
-    Returns dict with "components", "connections", and "design_system" keys.
-    """
-    client = get_client()
-
-    research_context = ""
-    if research_artifacts:
-        research_context = "\n\nAvailable research findings for reference:\n" + "\n".join(
-            f"- {a.get('id', '')}: {a.get('title', '')} — {a.get('summary', '')}"
-            for a in research_artifacts
-        )
-
-    user_prefs = ""
-    if context:
-        user_prefs = "\n\nUser preferences and requirements:\n" + "\n".join(
-            f"- {k}: {v}" for k, v in context.items()
-        )
-
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=12000,
-        thinking={"type": "adaptive"},
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are a product architect. Break down this product/project into a blueprint with components that could be handed to coding agents.
-
-Project description: "{description}"
-{research_context}{user_prefs}
+GENERATE_PLAN_INSTRUCTIONS = """You are a product architect. Break down the product/project described below into a blueprint with components that could be handed to coding agents.
 
 Create 4-6 plan components. Each should be a JSON object with a temp_id for cross-referencing:
-{{
+{
   "temp_id": "comp_1",
   "type": "plan_component",
   "title": "2-6 word component title",
@@ -662,12 +838,12 @@ Create 4-6 plan components. Each should be a JSON object with a temp_id for cros
   "references": ["art_xxxx", ...] (IDs of research artifacts this references, if any),
   "has_ui": true/false (whether this component has a user-facing interface),
   "ui_description": "Brief description of the UI screen if has_ui is true"
-}}
+}
 
 For components with has_ui: true, provide a ui_description that describes what the user would see on screen (layout, key elements, interactions).
 
 Also include 1-2 "mermaid" type artifacts for architecture diagrams:
-{{
+{
   "temp_id": "comp_N",
   "type": "mermaid",
   "title": "Architecture Overview",
@@ -676,16 +852,16 @@ Also include 1-2 "mermaid" type artifacts for architecture diagrams:
   "importance": 90,
   "references": [],
   "has_ui": false
-}}
+}
 
 Also define DIRECTED connections between components forming a DAG (no cycles).
 Each connection flows from a foundational component to one that depends on it.
-{{
+{
   "from_id": "comp_1",
   "to_id": "comp_3",
   "label": "relationship description (2-5 words)",
   "connection_type": "depends" or "references"
-}}
+}
 
 Rules for connections:
 - from_id is the FOUNDATION, to_id DEPENDS ON or BUILDS UPON it
@@ -694,29 +870,54 @@ Rules for connections:
 - Every component should have at least one connection
 
 Also define a design_system for the product's visual identity:
-{{
+{
   "primary_color": "#hex",
   "secondary_color": "#hex",
   "accent_color": "#hex",
   "background_style": "dark/light/gradient description",
   "font_style": "modern sans-serif/monospace/etc",
   "overall_feel": "minimal and clean/bold and vibrant/etc"
-}}
+}
 
 Return ONLY a JSON object with this structure, no other text:
-{{
+{
   "components": [ ... ],
   "connections": [ ... ],
-  "design_system": {{ ... }}
-}}""",
-            }
-        ],
+  "design_system": { ... }
+}"""
+
+
+async def generate_plan(
+    description: str, research_artifacts: list[dict], context: dict | None = None
+) -> dict:
+    """Use Claude to break down a project into plan components with connections.
+
+    Returns dict with "components", "connections", and "design_system" keys.
+    """
+
+    research_context = ""
+    if research_artifacts:
+        research_context = "\n\nAvailable research findings for reference:\n" + _budget_artifact_lines(
+            research_artifacts,
+            _reference_artifact_line,
+        )
+
+    user_prefs = ""
+    if context:
+        user_prefs = "\n\nUser preferences and requirements:\n" + "\n".join(
+            f"- {k}: {v}" for k, v in context.items()
+        )
+
+    response = await _claude_call(
+        _cached_prompt(GENERATE_PLAN_INSTRUCTIONS, f"""Project description: "{description}"
+{research_context}{user_prefs}"""),
+        max_tokens=12000, thinking=True,
     )
 
     text = _extract_text(response)
 
     try:
-        result = _parse_json_object(text)
+        result = await _parse_json(_parse_json_object, text)
         if "components" in result:
             return result
         # Shouldn't happen, but be defensive
@@ -726,12 +927,41 @@ Return ONLY a JSON object with this structure, no other text:
 
     # Fallback: try parsing as array (old format)
     try:
-        components = _parse_json_array(text)
+        components = await _parse_json(_parse_json_array, text)
         return {"components": components, "connections": []}
     except (json.JSONDecodeError, AttributeError):
         return {"components": [], "connections": []}
 
 
+def _feedback_lines(feedback_items: list[dict]) -> list[str]:
+    """Render feedback items as bullet lines, translating bounds into a rough screen region."""
+    lines = []
+    for i, item in enumerate(feedback_items, 1):
+        line = f"- Feedback #{i}: {item['comment']}"
+        if item.get('bounds'):
+            b = item['bounds']
+            cx, cy = b['x'] + b['w'] / 2, b['y'] + b['h'] / 2
+            h_pos = "left" if cx < 0.33 else "center" if cx < 0.67 else "right"
+            v_pos = "top" if cy < 0.33 else "middle" if cy < 0.67 else "bottom"
+            line += f" [Refers to the {v_pos}-{h_pos} area of the visual]"
+        lines.append(line)
+    return lines
+
+
+REGENERATE_INSTRUCTIONS = """You are a research/product analyst. An artifact needs to be improved based on feedback.
+
+Rewrite the artifact given below incorporating ALL the feedback. Update the written content so it matches the visual changes implied by the feedback.
+
+Return a JSON object with:
+{
+  "title": "Updated title (keep similar style, 2-6 words)",
+  "content": "Updated detailed markdown/mermaid content reflecting all feedback",
+  "summary": "Updated 1-2 sentence summary"
+}
+
+Return ONLY the JSON object, no other text."""
+
+
 async def regenerate_artifact(artifact: dict, feedback_items: list[dict]) -> dict | None:
     """Use Claude to regenerate an artifact based on feedback.
 
@@ -741,19 +971,8 @@ async def regenerate_artifact(artifact: dict, feedback_items: list[dict]) -> dic
 
     Returns updated artifact fields (title, content, summary) or None on failure.
     """
-    client = get_client()
 
-    feedback_lines = []
-    for i, item in enumerate(feedback_items, 1):
-        line = f"- Feedback #{i}: {item['comment']}"
-        if item.get('bounds'):
-            b = item['bounds']
-            cx, cy = b['x'] + b['w'] / 2, b['y'] + b['h'] / 2
-            h_pos = "left" if cx < 0.33 else "center" if cx < 0.67 else "right"
-            v_pos = "top" if cy < 0.33 else "middle" if cy < 0.67 else "bottom"
-            line += f" [Refers to the {v_pos}-{h_pos} area of the visual]"
-        feedback_lines.append(line)
-    feedback_text = "\n".join(feedback_lines)
+    feedback_text = "\n".join(_feedback_lines(feedback_items))
 
     artifact_type = artifact.get('type', 'unknown')
     type_instruction = ""
@@ -763,41 +982,106 @@ async def regenerate_artifact(artifact: dict, feedback_items: list[dict]) -> dic
             "You MUST update the mermaid syntax in 'content' to reflect the feedback — this is the ONLY way to change the visual diagram."
         )
 
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=8000,
-        thinking={"type": "adaptive"},
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are a research/product analyst. An artifact needs to be improved based on feedback.
+    key = cache_key(
+        str(artifact.get("id", "")), artifact_type,
+        artifact.get("title", ""), artifact.get("content", ""), feedback_text,
+    )
+    cached = _regenerate_cache.get(key)
+    if cached is not None:
+        return cached
 
-Original artifact:
+    response = await _claude_call(
+        _cached_prompt(REGENERATE_INSTRUCTIONS, f"""Original artifact:
 - Type: {artifact_type}
 - Title: {artifact.get('title', '')}
 - Content:
 {artifact.get('content', '')}
 
 Feedback to address:
-{feedback_text}
+{feedback_text}{type_instruction}"""),
+        max_tokens=4000,
+    )
 
-Rewrite the artifact incorporating ALL the feedback. Update the written content so it matches the visual changes implied by the feedback.{type_instruction}
+    text = _extract_text(response)
 
-Return a JSON object with:
-{{
-  "title": "Updated title (keep similar style, 2-6 words)",
-  "content": "Updated detailed markdown/mermaid content reflecting all feedback",
-  "summary": "Updated 1-2 sentence summary"
-}}
+    try:
+        result = await _parse_json(_parse_json_object, text)
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    _regenerate_cache.set(key, result)
+    return result
 
-Return ONLY the JSON object, no other text.""",
-            }
-        ],
+
+REGENERATE_BATCH_INSTRUCTIONS = """You are a research/product analyst. Several artifacts need to be improved based on feedback.
+
+Rewrite EACH artifact given below incorporating ALL of its feedback. Update the written content so it matches the visual changes implied by the feedback.
+For artifacts of type "mermaid", the 'content' field contains mermaid syntax — you MUST update that syntax to reflect the feedback, as it is the ONLY way to change the visual diagram.
+
+Return a JSON array with one object per artifact:
+[
+  {
+    "id": "the artifact id, unchanged",
+    "title": "Updated title (keep similar style, 2-6 words)",
+    "content": "Updated detailed markdown/mermaid content reflecting all feedback",
+    "summary": "Updated 1-2 sentence summary"
+  }
+]
+
+Return ONLY the JSON array, no other text."""
+
+
+async def regenerate_artifacts(
+    artifacts: list[dict], feedback_items_per_artifact: list[list[dict]]
+) -> list[dict | None]:
+    """Regenerate several artifacts from feedback in a single Claude call.
+
+    Args:
+        artifacts: Artifact dicts to regenerate.
+        feedback_items_per_artifact: Feedback items for each artifact, in the same order.
+
+    Returns updated fields (title, content, summary) per artifact, in input order,
+    with None for any artifact that could not be regenerated. Artifacts missing
+    from the batched response (or all of them, if it can't be parsed) fall back
+    to per-artifact calls.
+    """
+    if len(artifacts) == 1:
+        return [await regenerate_artifact(artifacts[0], feedback_items_per_artifact[0])]
+
+    batch = [
+        {
+            "id": a.get("id", ""),
+            "type": a.get("type", "unknown"),
+            "title": a.get("title", ""),
+            "content": a.get("content", ""),
+            "feedback": _feedback_lines(items),
+        }
+        for a, items in zip(artifacts, feedback_items_per_artifact)
+    ]
+
+    response = await _claude_call(
+        _cached_prompt(REGENERATE_BATCH_INSTRUCTIONS, f"""Artifacts (JSON array, each with its own feedback to address):
+{json.dumps(batch, indent=2)}"""),
+        max_tokens=12000,
     )
 
     text = _extract_text(response)
 
     try:
-        return _parse_json_object(text)
-    except (json.JSONDecodeError, AttributeError):
-        return None
+        updates = await _parse_json(_parse_json_array, text)
+        by_id = {u["id"]: u for u in updates if isinstance(u, dict) and u.get("id")}
+    except (json.JSONDecodeError, AttributeError, TypeError):
+        logger.warning("Failed to parse batched regeneration, falling back to per-artifact calls")
+        by_id = {}
+
+    # Artifacts the batched reply skipped get their own call
+    results: list[dict | None] = [by_id.get(a.get("id", "")) for a in artifacts]
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        retried = await asyncio.gather(*(
+            regenerate_artifact(artifacts[i], feedback_items_per_artifact[i])
+            for i in missing
+        ))
+        for i, r in zip(missing, retried):
+            results[i] = r
+
+    return results
@@ -1,37 +1,107 @@
 """DAG utilities: cycle detection and topological sort."""
 
 import logging
-from collections import defaultdict, deque
+from collections import defaultdict
+from collections.abc import Iterable
 
 logger = logging.getLogger(__name__)
 
 
-def remove_cycles(connections_data: list[dict], artifact_ids: set[str]) -> list[dict]:
-    """Remove back-edges to enforce DAG constraint using DFS."""
-    adj: dict[str, list[tuple[str, int]]] = defaultdict(list)
-    for i, c in enumerate(connections_data):
-        src, dst = c.get("from_id", ""), c.get("to_id", "")
-        if src in artifact_ids and dst in artifact_ids:
-            adj[src].append((dst, i))
+WHITE, GRAY, BLACK = 0, 1, 2
+
 
-    WHITE, GRAY, BLACK = 0, 1, 2
-    color: dict[str, int] = {aid: WHITE for aid in artifact_ids}
+def _find_back_edges(
+    nodes: Iterable[str], adj: dict[str, list[tuple[str, int]]]
+) -> set[int]:
+    """Return indices of edges that close a cycle, restricted to the given nodes.
+
+    Iterative DFS with an explicit (node, neighbor-iterator) stack: no
+    per-node Python frames and no recursion limit on deep graphs.
+    """
+    color: dict[str, int] = dict.fromkeys(nodes, WHITE)
     back_edges: set[int] = set()
 
-    def dfs(node: str) -> None:
-        color[node] = GRAY
-        for neighbor, edge_idx in adj[node]:
-            if color[neighbor] == GRAY:
+    for root in list(color):
+        if color[root] != WHITE:
+            continue
+        color[root] = GRAY
+        stack = [(root, iter(adj.get(root, ())))]
+        while stack:
+            node, it = stack[-1]
+            nxt = next(it, None)
+            if nxt is None:
+                color[node] = BLACK
+                stack.pop()
+                continue
+            neighbor, edge_idx = nxt
+            state = color.get(neighbor)
+            if state == GRAY:
                 back_edges.add(edge_idx)
-                logger.warning("Cycle detected: removing edge %s → %s", node, neighbor)
-            elif color[neighbor] == WHITE:
-                dfs(neighbor)
-        color[node] = BLACK
+            elif state == WHITE:
+                color[neighbor] = GRAY
+                stack.append((neighbor, iter(adj.get(neighbor, ()))))
+
+    return back_edges
 
-    for aid in artifact_ids:
-        if color[aid] == WHITE:
-            dfs(aid)
 
+def remove_cycles(
+    connections_data: list[dict],
+    artifact_ids: set[str],
+    insertion_order: list[str] | None = None,
+) -> list[dict]:
+    """Remove back-edges to enforce DAG constraint.
+
+    A Kahn pass (seeded in insertion_order when given, for deterministic
+    results) runs first: if every node drains the graph is already a DAG and
+    no DFS is needed. Otherwise only the undrained residual, which holds
+    every cycle, is searched for back-edges.
+    """
+    # A lone edge can only be a cycle if it is a self-loop
+    if len(connections_data) <= 1 and not any(
+        c.get("from_id") == c.get("to_id") for c in connections_data
+    ):
+        return connections_data
+
+    adj: dict[str, list[tuple[str, int]]] = defaultdict(list)
+    in_degree: dict[str, int] = dict.fromkeys(artifact_ids, 0)
+    for i, c in enumerate(connections_data):
+        src, dst = c.get("from_id", ""), c.get("to_id", "")
+        if src in artifact_ids and dst in artifact_ids:
+            adj[src].append((dst, i))
+            in_degree[dst] += 1
+
+    # insertion_order only sets precedence: unknown ids are ignored and any
+    # artifact it omits still takes part, after the ordered ones
+    order = [aid for aid in dict.fromkeys(insertion_order or ()) if aid in in_degree]
+    if len(order) < len(in_degree):
+        listed = set(order)
+        order += [aid for aid in artifact_ids if aid not in listed]
+    ready = [aid for aid in order if in_degree[aid] == 0]
+    drained = 0
+    while ready:
+        node = ready.pop()
+        drained += 1
+        for neighbor, _ in adj[node]:
+            in_degree[neighbor] -= 1
+            if in_degree[neighbor] == 0:
+                ready.append(neighbor)
+
+    if drained == len(in_degree):
+        return connections_data
+
+    back_edges = _find_back_edges((aid for aid in order if in_degree[aid] > 0), adj)
+
+    if not back_edges:
+        return connections_data
+
+    logger.warning(
+        "Cycles detected: removing %d edge(s): %s",
+        len(back_edges),
+        ", ".join(
+            f"{connections_data[i]['from_id']} → {connections_data[i]['to_id']}"
+            for i in sorted(back_edges)
+        ),
+    )
     return [c for i, c in enumerate(connections_data) if i not in back_edges]
 
 
@@ -43,33 +113,88 @@ def topological_sort_layers(
     Each inner list is a set of artifacts that can appear at the same depth.
     connections: list of dicts with "from_id" and "to_id" keys.
     """
-    id_set = set(artifact_ids)
-    adj: dict[str, list[str]] = defaultdict(list)
-    in_degree: dict[str, int] = {aid: 0 for aid in id_set}
+    # Work on dense integer indices: list indexing instead of dict hashing.
+    n = len(artifact_ids)
+    idx = {aid: i for i, aid in enumerate(artifact_ids)}
+    adj: list[list[int]] = [[] for _ in range(n)]
+    in_deg = [0] * n
 
     for c in connections:
-        src, dst = c["from_id"], c["to_id"]
-        if src in id_set and dst in id_set:
-            adj[src].append(dst)
-            in_degree[dst] = in_degree.get(dst, 0) + 1
+        s, d = idx.get(c["from_id"]), idx.get(c["to_id"])
+        if s is not None and d is not None:
+            adj[s].append(d)
+            in_deg[d] += 1
 
-    queue = deque(aid for aid in artifact_ids if in_degree[aid] == 0)
+    layer = [i for i in range(n) if in_deg[i] == 0]
     layers: list[list[str]] = []
 
-    while queue:
-        layer = list(queue)
-        layers.append(layer)
-        next_queue: deque[str] = deque()
+    while layer:
+        layers.append([artifact_ids[i] for i in layer])
+        next_layer: list[int] = []
         for node in layer:
             for neighbor in adj[node]:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    next_queue.append(neighbor)
-        queue = next_queue
+                in_deg[neighbor] -= 1
+                if in_deg[neighbor] == 0:
+                    next_layer.append(neighbor)
+        layer = next_layer
 
     # Any remaining nodes with in_degree > 0 are in cycles — append them as final layer
-    remaining = [aid for aid in artifact_ids if in_degree[aid] > 0]
+    remaining = [artifact_ids[i] for i in range(n) if in_deg[i] > 0]
     if remaining:
         layers.append(remaining)
 
     return layers
+
+
+def topological_sort_layers_acyclic(
+    artifact_ids: list[str], connections: list[dict]
+) -> tuple[list[list[str]], list[dict]]:
+    """Kahn's layering that also breaks cycles, in a single adjacency build.
+
+    Runs Kahn's algorithm once; if nodes are left over (they sit on or behind
+    a cycle), a DFS restricted to that residual subgraph picks back-edges to
+    drop and layering resumes. Replaces remove_cycles + topological_sort_layers
+    when both are needed.
+
+    Returns (layers, dropped_connections).
+    """
+    id_set = set(artifact_ids)
+    adj: dict[str, list[tuple[str, int]]] = defaultdict(list)
+    in_degree: dict[str, int] = {aid: 0 for aid in id_set}
+
+    for i, c in enumerate(connections):
+        src, dst = c["from_id"], c["to_id"]
+        if src in id_set and dst in id_set:
+            adj[src].append((dst, i))
+            in_degree[dst] += 1
+
+    layers: list[list[str]] = []
+    dropped: set[int] = set()
+
+    def drain(layer: list[str]) -> None:
+        while layer:
+            layers.append(layer)
+            next_layer: list[str] = []
+            for node in layer:
+                for neighbor, edge_idx in adj[node]:
+                    if edge_idx in dropped:
+                        continue
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        next_layer.append(neighbor)
+            layer = next_layer
+
+    drain([aid for aid in artifact_ids if in_degree[aid] == 0])
+
+    remaining = [aid for aid in artifact_ids if in_degree[aid] > 0]
+    if remaining:
+        # Dropping the residual's back-edges leaves it acyclic, so one more
+        # drain places every remaining node.
+        dropped = _find_back_edges(remaining, adj)
+        for edge_idx in dropped:
+            in_degree[connections[edge_idx]["to_id"]] -= 1
+        drain([aid for aid in remaining if in_degree[aid] == 0])
+        logger.warning("Cycles detected: dropped %d edge(s) while layering", len(dropped))
+
+    return layers, [connections[i] for i in sorted(dropped)]
+
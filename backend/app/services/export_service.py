@@ -1,9 +1,10 @@
 """Export service: builds a structured markdown document from a project."""
 
+import io
 import logging
 
 from app.db.supabase import get_db
-from app.services.dag_utils import topological_sort_layers
+from app.services.dag_utils import topological_sort_layers_acyclic
 
 logger = logging.getLogger(__name__)
 
@@ -26,103 +27,115 @@ async def export_project_markdown(project_id: str) -> str:
     groups = await db.get_groups(project_id)
     feedback = await db.get_feedback(project_id)
 
-    sections: list[str] = []
+    # Every line is written with its trailing newline; the final one is
+    # trimmed on return so output matches the previous "\n".join(sections).
+    buf = io.StringIO()
+    out = buf.write
 
     # --- Project overview ---
-    sections.append(f"# {project.title}\n")
+    out(f"# {project.title}\n\n")
     if project.description:
-        sections.append(f"{project.description}\n")
-    sections.append(f"**Project ID:** `{project.id}`  ")
-    sections.append(f"**Phase:** {project.phase}\n")
+        out(f"{project.description}\n\n")
+    out(f"**Project ID:** `{project.id}`  \n")
+    out(f"**Phase:** {project.phase}\n\n")
 
     # --- Research findings ---
     if research_artifacts:
-        sections.append("## Research Findings\n")
+        out("## Research Findings\n\n")
 
-        # Group artifacts by group
-        group_map = {g.id: g for g in groups if g.phase == "research"}
+        # Group artifacts by group; titled groups first, sorted by title
+        group_titles = {g.id: g.title for g in groups if g.phase == "research"}
         grouped: dict[str | None, list] = {}
         for art in research_artifacts:
-            grouped.setdefault(art.group_id, []).append(art)
-
-        for group_id, arts in grouped.items():
-            if group_id and group_id in group_map:
-                sections.append(f"### {group_map[group_id].title}\n")
-            elif group_id is None and len(grouped) > 1:
-                sections.append("### Ungrouped\n")
+            bucket = grouped.get(art.group_id)
+            if bucket is None:
+                grouped[art.group_id] = bucket = []
+            bucket.append(art)
+        has_multiple_groups = len(grouped) > 1
+        ordered = sorted(
+            grouped.items(),
+            key=lambda kv: (kv[0] not in group_titles, group_titles.get(kv[0], "")),
+        )
+
+        for group_id, arts in ordered:
+            if group_id in group_titles:
+                out(f"### {group_titles[group_id]}\n\n")
+            elif group_id is None and has_multiple_groups:
+                out("### Ungrouped\n\n")
 
             for art in arts:
-                sections.append(f"#### {art.title} (`{art.id}`)\n")
+                title, aid, img = art.title, art.id, art.image_url
+                out(f"#### {title} (`{aid}`)\n\n")
                 if art.summary:
-                    sections.append(f"{art.summary}\n")
+                    out(f"{art.summary}\n\n")
                 if art.source_url:
-                    sections.append(f"Source: {art.source_url}\n")
-                if art.image_url:
-                    sections.append(f"![{art.title}]({art.image_url})\n")
+                    out(f"Source: {art.source_url}\n\n")
+                if img:
+                    out(f"![{title}]({img})\n\n")
 
     # --- Architecture (mermaid diagrams) ---
     mermaid_artifacts = [a for a in plan_artifacts if a.type == "mermaid"]
     if mermaid_artifacts:
-        sections.append("## Architecture\n")
+        out("## Architecture\n\n")
         for art in mermaid_artifacts:
-            sections.append(f"### {art.title}\n")
-            sections.append(f"```mermaid\n{art.content}\n```\n")
-            if art.image_url:
-                sections.append(f"![{art.title}]({art.image_url})\n")
+            title, img = art.title, art.image_url
+            out(f"### {title}\n\n")
+            out(f"```mermaid\n{art.content}\n```\n\n")
+            if img:
+                out(f"![{title}]({img})\n\n")
 
     # --- Plan components ---
     non_mermaid_plan = [a for a in plan_artifacts if a.type != "mermaid"]
     if non_mermaid_plan:
-        sections.append("## Plan Components\n")
+        out("## Plan Components\n\n")
 
         conn_dicts = [
             {"from_id": c.from_artifact_id, "to_id": c.to_artifact_id}
             for c in connections
         ]
         plan_ids = [a.id for a in non_mermaid_plan]
-        layers = topological_sort_layers(plan_ids, conn_dicts)
+        layers, _ = topological_sort_layers_acyclic(plan_ids, conn_dicts)
         id_to_art = {a.id: a for a in non_mermaid_plan}
 
         layer_num = 0
         for layer in layers:
             layer_num += 1
-            sections.append(f"### Layer {layer_num}\n")
+            out(f"### Layer {layer_num}\n\n")
             for aid in layer:
                 art = id_to_art.get(aid)
                 if not art:
                     continue
-                sections.append(f"#### {art.title} (`{art.id}`)\n")
-                sections.append(f"**Type:** {art.type}  ")
-                sections.append(f"**Importance:** {art.importance}/100\n")
+                title, img = art.title, art.image_url
+                out(f"#### {title} (`{aid}`)\n\n")
+                out(f"**Type:** {art.type}  \n")
+                out(f"**Importance:** {art.importance}/100\n\n")
                 if art.content:
-                    sections.append(f"{art.content}\n")
-                if art.image_url:
-                    sections.append(f"![{art.title}]({art.image_url})\n")
+                    out(f"{art.content}\n\n")
+                if img:
+                    out(f"![{title}]({img})\n\n")
 
         # --- Implementation checklist ---
-        sections.append("## Implementation Checklist\n")
+        out("## Implementation Checklist\n\n")
         for layer in layers:
             for aid in layer:
                 art = id_to_art.get(aid)
                 if art:
-                    sections.append(f"- [ ] {art.title} (`{art.id}`)")
-        sections.append("")
+                    out(f"- [ ] {art.title} (`{aid}`)\n")
+        out("\n")
 
     # --- Dependency graph ---
     if connections:
-        sections.append("## Dependency Graph\n")
+        out("## Dependency Graph\n\n")
         for c in connections:
-            sections.append(
-                f"- `{c.from_artifact_id}` --[{c.label or c.connection_type}]--> `{c.to_artifact_id}`"
-            )
-        sections.append("")
+            out(f"- `{c.from_artifact_id}` --[{c.label or c.connection_type}]--> `{c.to_artifact_id}`\n")
+        out("\n")
 
     # --- Pending feedback ---
     pending = [f for f in feedback if f.status == "pending"]
     if pending:
-        sections.append("## Pending Feedback\n")
+        out("## Pending Feedback\n\n")
         for fb in pending:
-            sections.append(f"- **{fb.artifact_id}** ({fb.source}): {fb.comment}")
-        sections.append("")
+            out(f"- **{fb.artifact_id}** ({fb.source}): {fb.comment}\n")
+        out("\n")
 
-    return "\n".join(sections)
+    return buf.getvalue().removesuffix("\n")
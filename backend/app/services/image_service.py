@@ -1,11 +1,16 @@
 """Gemini image generation service for artifact visuals."""
 
 import asyncio
+import hashlib
 import logging
+import random
+import uuid
 from collections.abc import Callable, Coroutine
 from typing import Any
 
+import httpx
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
 
 from app.config import get_settings
@@ -15,93 +20,240 @@ logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 INITIAL_BACKOFF = 2.0
+MAX_BACKOFF = 30.0
 TIMEOUT_SECONDS = 45
 
-PROMPT_TEMPLATES = {
-    "research_finding": (
-        "Create an infographic visualizing: {title}. "
-        "Key findings: {summary}. "
+# Caps in-flight Gemini requests so large batches don't trip 429s and then
+# retry in lockstep.
+_gemini_semaphore = asyncio.Semaphore(get_settings().GEMINI_CONCURRENCY or 8)
+
+# Open (set) normally; one 429 closes it briefly so the whole batch backs off
+# together instead of every request retrying into the same limit.
+_rate_limit_gate = asyncio.Event()
+_rate_limit_gate.set()
+
+_client: genai.Client | None = None
+_client_lock = asyncio.Lock()
+
+# One f-string builder per artifact type: no format-string parsing per call.
+PROMPT_FNS: dict[str, Callable[[str, str, str], str]] = {
+    "research_finding": lambda title, summary, design_context: (
+        f"Create an infographic visualizing: {title}. "
+        f"Key findings: {summary}. "
         "Style: clean data visualization on dark background (#1e1e2e). "
-        "Use bold colors, clear icons, and minimal text. No watermarks. {design_context}"
+        f"Use bold colors, clear icons, and minimal text. No watermarks. {design_context}"
     ),
-    "competitor": (
-        "Create a brand/product visual for: {title}. "
-        "{summary}. "
+    "competitor": lambda title, summary, design_context: (
+        f"Create a brand/product visual for: {title}. "
+        f"{summary}. "
         "Style: product showcase on dark background (#1e1e2e). "
-        "Clean, professional design. No watermarks. {design_context}"
+        f"Clean, professional design. No watermarks. {design_context}"
     ),
-    "plan_component": (
-        "Create a blueprint/wireframe diagram for: {title}. "
-        "Component: {summary}. "
+    "plan_component": lambda title, summary, design_context: (
+        f"Create a blueprint/wireframe diagram for: {title}. "
+        f"Component: {summary}. "
         "Style: technical blueprint on dark background (#1e1e2e). "
-        "Use clean lines, geometric shapes. No watermarks. {design_context}"
+        f"Use clean lines, geometric shapes. No watermarks. {design_context}"
     ),
-    "ui_screen": (
-        "Create a high-fidelity UI mockup for: {title}. "
-        "Screen purpose: {summary}. {design_context} "
+    "ui_screen": lambda title, summary, design_context: (
+        f"Create a high-fidelity UI mockup for: {title}. "
+        f"Screen purpose: {summary}. {design_context} "
         "Style: modern app UI screenshot, realistic interface, clean layout, readable text placeholders. No watermarks."
     ),
-    "markdown": (
-        "Create a visual summary infographic for: {title}. "
-        "{summary}. "
+    "markdown": lambda title, summary, design_context: (
+        f"Create a visual summary infographic for: {title}. "
+        f"{summary}. "
         "Style: clean, modern infographic on dark background (#1e1e2e). "
-        "No watermarks. {design_context}"
+        f"No watermarks. {design_context}"
     ),
 }
 
 
 def _get_prompt(artifact: dict, design_context: str = "") -> str:
-    artifact_type = artifact.get("type", "markdown")
-    template = PROMPT_TEMPLATES.get(artifact_type, PROMPT_TEMPLATES["markdown"])
-    return template.format(
-        title=artifact.get("title", ""),
-        summary=artifact.get("summary", artifact.get("content", "")[:200]),
-        design_context=design_context,
-    )
+    build = PROMPT_FNS.get(artifact.get("type", "markdown"), PROMPT_FNS["markdown"])
+    summary = (artifact.get("summary") or artifact.get("content", ""))[:200]
+    return build(artifact.get("title", ""), summary, design_context)
 
 
-def _get_client() -> genai.Client:
-    settings = get_settings()
-    if not settings.GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not configured")
-    return genai.Client(api_key=settings.GEMINI_API_KEY)
+def _retry_after_seconds(error: Exception) -> float | None:
+    """Read a Retry-After header (seconds) off a Gemini API error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt: int, error: Exception | None = None) -> float:
+    """Full-jitter exponential backoff; honors Retry-After on 429 responses."""
+    if _is_rate_limited(error):
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after
+    return random.uniform(0, min(INITIAL_BACKOFF * (2 ** attempt), MAX_BACKOFF))
+
+
+def _is_rate_limited(error: Exception | None) -> bool:
+    return isinstance(error, genai_errors.APIError) and error.code == 429
+
+
+def _pause_cohort(delay: float) -> None:
+    """Close the shared rate-limit gate for `delay` seconds."""
+    if not _rate_limit_gate.is_set():
+        return
+    _rate_limit_gate.clear()
+    asyncio.get_running_loop().call_later(delay, _rate_limit_gate.set)
+
+
+async def _retry_wait(attempt: int, error: Exception | None) -> None:
+    """Sleep before the next attempt; a 429 also pauses every other caller."""
+    delay = _backoff_delay(attempt, error)
+    if _is_rate_limited(error):
+        _pause_cohort(delay)
+    await asyncio.sleep(delay)
+
+
+async def _generate_image(client: genai.Client, prompt: str) -> tuple[bytes, str] | None:
+    """Stream a Gemini response and return its first inline image as (bytes, mime).
+
+    The stream is closed as soon as an image part arrives, so we don't wait
+    on any trailing text the model is still generating.
+    """
+    stream = await client.aio.models.generate_content_stream(
+        model="gemini-3-pro-image-preview",
+        contents=prompt,
+        config=types.GenerateContentConfig(
+            response_modalities=["IMAGE", "TEXT"],
+        ),
+    )
+    try:
+        async for chunk in stream:
+            if not chunk.candidates or not chunk.candidates[0].content:
+                continue
+            for part in chunk.candidates[0].content.parts or ():
+                if part.inline_data and part.inline_data.mime_type.startswith("image/"):
+                    return part.inline_data.data, part.inline_data.mime_type
+    finally:
+        await stream.aclose()
+    return None
 
 
-async def generate_artifact_image(artifact: dict, context: str, design_context: str = "") -> str | None:
+def _image_ext(mime: str) -> str:
+    return "jpg" if "jpeg" in mime else mime.split("/")[-1]
+
+
+async def _upload_image(img_bytes: bytes, mime: str, path_stem: str) -> str:
+    """Upload raw image bytes to Supabase Storage."""
+    return await get_db().upload_image_async(img_bytes, f"{path_stem}.{_image_ext(mime)}", content_type=mime)
+
+
+async def _get_client() -> genai.Client:
+    """Shared genai.Client so every image call reuses one connection pool."""
+    global _client
+    if _client is None:
+        async with _client_lock:
+            if _client is None:
+                settings = get_settings()
+                if not settings.GEMINI_API_KEY:
+                    raise ValueError("GEMINI_API_KEY not configured")
+                # Size the pool to the semaphore: every in-flight call gets a
+                # keep-alive connection and nothing idles beyond that.
+                limit = settings.GEMINI_CONCURRENCY or 8
+                _client = genai.Client(
+                    api_key=settings.GEMINI_API_KEY,
+                    http_options=types.HttpOptions(
+                        async_client_args={
+                            "limits": httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+                        },
+                    ),
+                )
+    return _client
+
+
+async def close_client() -> None:
+    """Release the shared Gemini client (called on app shutdown)."""
+    global _client
+    client, _client = _client, None
+    if client is None:
+        return
+    # aclose()/close() only exist on newer google-genai releases
+    aclose = getattr(client.aio, "aclose", None)
+    if aclose is not None:
+        await aclose()
+    close = getattr(client, "close", None)
+    if close is not None:
+        await asyncio.to_thread(close)
+
+
+async def generate_artifact_image(
+    artifact: dict, design_context: str = "", use_cache: bool = True
+) -> str | None:
     """Generate an image for a single artifact using Gemini.
 
+    Pass use_cache=False to force a fresh render (e.g. after feedback) even
+    when an image for the same prompt is cached; the result is still cached.
+
     Returns a public Supabase Storage URL or None on failure.
     """
+    image_url, upload = await _render_artifact_image(artifact, design_context, use_cache=use_cache)
+    if upload is not None and not await upload:
+        return None
+    return image_url
+
+
+async def _upload_and_cache(img_bytes: bytes, mime: str, destination: str, prompt_hash: str) -> bool:
+    try:
+        public_url = await get_db().upload_image_async(img_bytes, destination, content_type=mime)
+    except Exception as e:
+        logger.error("Upload failed for %s: %s", destination, e)
+        return False
+    await get_db().put_cached_image(prompt_hash, public_url)
+    return True
+
+
+async def _render_artifact_image(
+    artifact: dict, design_context: str = "", use_cache: bool = True
+) -> tuple[str | None, asyncio.Task[bool] | None]:
+    """Generate an artifact image and start its upload without waiting on it.
+
+    Returns (public_url, upload_task). Images are stored under the prompt
+    hash, so the URL is known before the upload lands; callers must await
+    the task before publishing the URL. Cache hits return (url, None);
+    use_cache=False skips the lookup but still records the new image.
+    """
     prompt = _get_prompt(artifact, design_context=design_context)
-    client = _get_client()
-    artifact_id = artifact.get("id", "unknown")
-    project_id = artifact.get("project_id", "unknown")
+    # Identical prompts render interchangeable images: reuse a prior upload
+    # instead of paying for another Gemini generation.
+    prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+    db = get_db()
+    if use_cache:
+        cached_url = await db.get_cached_image(prompt_hash)
+        if cached_url:
+            return cached_url, None
+
+    client = await _get_client()
 
     for attempt in range(MAX_RETRIES):
+        # Only this attempt's error decides the backoff and cohort pause
+        last_error: Exception | None = None
         try:
-            response = await asyncio.wait_for(
-                asyncio.to_thread(
-                    client.models.generate_content,
-                    model="gemini-3-pro-image-preview",
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        response_modalities=["IMAGE", "TEXT"],
-                    ),
-                ),
-                timeout=TIMEOUT_SECONDS,
-            )
-
-            # Extract image from response and upload to Supabase Storage
-            if response.candidates:
-                for part in response.candidates[0].content.parts:
-                    if part.inline_data and part.inline_data.mime_type.startswith("image/"):
-                        img_bytes = part.inline_data.data
-                        mime = part.inline_data.mime_type
-                        ext = "jpg" if "jpeg" in mime else mime.split("/")[-1]
-                        destination = f"{project_id}/{artifact_id}.{ext}"
-                        db = get_db()
-                        public_url = db.upload_image(img_bytes, destination, content_type=mime)
-                        return public_url
+            async with _gemini_semaphore:
+                await _rate_limit_gate.wait()
+                image = await asyncio.wait_for(_generate_image(client, prompt), timeout=TIMEOUT_SECONDS)
+
+            # Upload the raw bytes straight to Supabase Storage
+            if image:
+                img_bytes, mime = image
+                # Content-addressed and never overwritten by a later render,
+                # so cached URLs shared across artifacts stay valid. Forced
+                # re-renders get their own object rather than replacing it.
+                name = prompt_hash if use_cache else f"{prompt_hash}-{uuid.uuid4().hex[:8]}"
+                destination = f"cache/{name}.{_image_ext(mime)}"
+                upload = asyncio.create_task(_upload_and_cache(img_bytes, mime, destination, prompt_hash))
+                return db.get_image_public_url(destination), upload
 
             logger.warning(
                 "No image in Gemini response for artifact %s (attempt %d)",
@@ -116,6 +268,7 @@ async def generate_artifact_image(artifact: dict, context: str, design_context:
                 attempt + 1,
             )
         except Exception as e:
+            last_error = e
             logger.warning(
                 "Error generating image for artifact %s (attempt %d): %s",
                 artifact.get("id", "?"),
@@ -124,9 +277,9 @@ async def generate_artifact_image(artifact: dict, context: str, design_context:
             )
 
         if attempt < MAX_RETRIES - 1:
-            await asyncio.sleep(INITIAL_BACKOFF * (2 ** attempt))
+            await _retry_wait(attempt, last_error)
 
-    return None
+    return None, None
 
 
 ProgressCallback = Callable[[str, bool, str | None], Coroutine[Any, Any, None]]
@@ -156,47 +309,35 @@ async def generate_design_pair_images(
                 await on_progress(option_id, dimension_id, False, None)
             return option_id, None
 
-        client = _get_client()
         for attempt in range(MAX_RETRIES):
+            last_error: Exception | None = None
             try:
-                response = await asyncio.wait_for(
-                    asyncio.to_thread(
-                        client.models.generate_content,
-                        model="gemini-3-pro-image-preview",
-                        contents=prompt,
-                        config=types.GenerateContentConfig(
-                            response_modalities=["IMAGE", "TEXT"],
-                        ),
-                    ),
-                    timeout=TIMEOUT_SECONDS,
-                )
+                async with _gemini_semaphore:
+                    await _rate_limit_gate.wait()
+                    image = await asyncio.wait_for(_generate_image(client, prompt), timeout=TIMEOUT_SECONDS)
 
-                if response.candidates:
-                    for part in response.candidates[0].content.parts:
-                        if part.inline_data and part.inline_data.mime_type.startswith("image/"):
-                            img_bytes = part.inline_data.data
-                            mime = part.inline_data.mime_type
-                            ext = "jpg" if "jpeg" in mime else mime.split("/")[-1]
-                            destination = f"{project_id}/design_prefs/{option_id}.{ext}"
-                            db = get_db()
-                            public_url = db.upload_image(img_bytes, destination, content_type=mime)
-                            if on_progress:
-                                await on_progress(option_id, dimension_id, True, public_url)
-                            return option_id, public_url
+                if image:
+                    public_url = await _upload_image(*image, f"{project_id}/design_prefs/{option_id}")
+                    if on_progress:
+                        await on_progress(option_id, dimension_id, True, public_url)
+                    return option_id, public_url
 
                 logger.warning("No image for design option %s (attempt %d)", option_id, attempt + 1)
             except asyncio.TimeoutError:
                 logger.warning("Timeout for design option %s (attempt %d)", option_id, attempt + 1)
             except Exception as e:
+                last_error = e
                 logger.warning("Error for design option %s (attempt %d): %s", option_id, attempt + 1, str(e))
 
             if attempt < MAX_RETRIES - 1:
-                await asyncio.sleep(INITIAL_BACKOFF * (2 ** attempt))
+                await _retry_wait(attempt, last_error)
 
         if on_progress:
             await on_progress(option_id, dimension_id, False, None)
         return option_id, None
 
+    client = await _get_client()
+
     # Collect all options
     tasks = []
     for dim in dimensions:
@@ -222,12 +363,15 @@ async def generate_design_pair_images(
 
 async def generate_images_parallel(
     artifacts: list[dict],
-    context: str,
     on_progress: ProgressCallback | None = None,
     design_context: str = "",
 ) -> dict[str, str]:
     """Generate images for all artifacts concurrently.
 
+    Artifacts only need the fields the prompt reads (id, project_id, type,
+    title, summary; content is a fallback for an empty summary), so callers
+    can pass slim projections rather than full model dumps.
+
     Returns a dict mapping artifact_id -> public image URL for successful generations.
     """
     settings = get_settings()
@@ -237,20 +381,25 @@ async def generate_images_parallel(
 
     async def _generate_one(artifact: dict) -> tuple[str, str | None]:
         artifact_id = artifact.get("id", "")
-        image_url = await generate_artifact_image(artifact, context, design_context=design_context)
+        image_url, upload = await _render_artifact_image(artifact, design_context)
+        # Gemini slots are held only per call, so the next artifact renders
+        # while this upload finishes; the URL is only published once it resolves.
+        if upload is not None and not await upload:
+            image_url = None
         if on_progress:
             await on_progress(artifact_id, image_url is not None, image_url)
         return artifact_id, image_url
 
-    tasks = [_generate_one(a) for a in artifacts]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
+    # Consume results as they land so progress streams from the first image,
+    # not after the slowest one.
+    tasks = [asyncio.create_task(_generate_one(a)) for a in artifacts]
     image_map: dict[str, str] = {}
-    for result in results:
-        if isinstance(result, Exception):
-            logger.error("Image generation task failed: %s", result)
+    for fut in asyncio.as_completed(tasks):
+        try:
+            artifact_id, image_url = await fut
+        except Exception as e:
+            logger.error("Image generation task failed: %s", e)
             continue
-        artifact_id, image_url = result
         if image_url:
             image_map[artifact_id] = image_url
 
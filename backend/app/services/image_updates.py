@@ -0,0 +1,73 @@
+"""Debounced, bulk persistence of generated image URLs."""
+
+import asyncio
+import logging
+
+from app.db.supabase import get_db
+from app.ws.manager import WSManager
+
+logger = logging.getLogger(__name__)
+
+FLUSH_DELAY = 0.2
+
+
+class ImageUpdateBatcher:
+    """Coalesces image_url updates into one DB write and one WS frame per flush.
+
+    Images tend to finish in bursts; instead of a PATCH + send per artifact,
+    updates collect for FLUSH_DELAY seconds after the first arrival and go out
+    together as an images_updated_batch event.
+    """
+
+    def __init__(self, project_id: str, ws_manager: WSManager, delay: float = FLUSH_DELAY):
+        self.project_id = project_id
+        self.ws_manager = ws_manager
+        self.delay = delay
+        self._pending: dict[str, str] = {}
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def add(self, artifact_id: str, image_url: str) -> None:
+        self._pending[artifact_id] = image_url
+        self._wake.set()
+
+    async def close(self) -> None:
+        """Flush anything still pending and stop the background task."""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+
+    async def _run(self) -> None:
+        while not self._closed:
+            await self._wake.wait()
+            if not self._closed:
+                await asyncio.sleep(self.delay)
+            self._wake.clear()
+            await self._flush()
+        if self._pending:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        db = get_db()
+        if not await db.bulk_update_artifact_images(batch):
+            # RPC missing or failed: fall back to per-row updates
+            batch = {
+                aid: url for aid, url in batch.items()
+                if await db.update_artifact_image(aid, url)
+            }
+            if not batch:
+                return
+        logger.info("Flushed %d image URLs for project=%s", len(batch), self.project_id)
+        await self.ws_manager.send_event(self.project_id, "images_updated_batch", {
+            "images": [
+                {"artifact_id": aid, "image_url": url} for aid, url in batch.items()
+            ],
+        })
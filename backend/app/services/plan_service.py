@@ -1,10 +1,14 @@
 """Product/project breakdown service."""
 
+import asyncio
 import logging
 
+import orjson
+
 from app.models.schema import Artifact, ArtifactConnection, Group, generate_artifact_id
 from app.services import claude_service, image_service
 from app.services.dag_utils import remove_cycles
+from app.services.image_updates import ImageUpdateBatcher
 from app.ws.manager import WSManager
 from app.db.supabase import get_db
 
@@ -16,6 +20,15 @@ CARD_WIDTH = 320
 CARD_HEIGHT = 240
 GAP = 40
 
+DESIGN_SYSTEM_LABELS = (
+    ("primary_color", "Primary color"),
+    ("secondary_color", "Secondary color"),
+    ("accent_color", "Accent color"),
+    ("background_style", "Background"),
+    ("font_style", "Typography"),
+    ("overall_feel", "Overall feel"),
+)
+
 
 async def run_plan(
     project_id: str,
@@ -28,17 +41,12 @@ async def run_plan(
     db = get_db()
     logger.info("Plan started for project=%s description=%r, %d reference artifacts", project_id, description, len(reference_artifact_ids))
 
-    # Get referenced research artifacts
-    research_artifacts = []
+    # Get referenced research artifacts (all of them when none are referenced)
+    all_artifacts = await db.get_artifacts(project_id, phase="research")
     if reference_artifact_ids:
-        all_artifacts = await db.get_artifacts(project_id, phase="research")
-        research_artifacts = [
-            a.model_dump() for a in all_artifacts if a.id in reference_artifact_ids
-        ]
-    else:
-        # Include all research artifacts as context
-        all_artifacts = await db.get_artifacts(project_id, phase="research")
-        research_artifacts = [a.model_dump() for a in all_artifacts]
+        wanted = set(reference_artifact_ids)
+        all_artifacts = [a for a in all_artifacts if a.id in wanted]
+    research_artifacts = [a.model_dump() for a in all_artifacts]
 
     # Generate plan components + connections
     plan_result = await claude_service.generate_plan(description, research_artifacts, context=context)
@@ -50,23 +58,16 @@ async def run_plan(
     # Build design_context string for image generation
     design_context = ""
     if design_system:
-        parts = []
-        if design_system.get("primary_color"):
-            parts.append(f"Primary color: {design_system['primary_color']}")
-        if design_system.get("secondary_color"):
-            parts.append(f"Secondary color: {design_system['secondary_color']}")
-        if design_system.get("accent_color"):
-            parts.append(f"Accent color: {design_system['accent_color']}")
-        if design_system.get("background_style"):
-            parts.append(f"Background: {design_system['background_style']}")
-        if design_system.get("font_style"):
-            parts.append(f"Typography: {design_system['font_style']}")
-        if design_system.get("overall_feel"):
-            parts.append(f"Overall feel: {design_system['overall_feel']}")
-        design_context = "Design system: " + ", ".join(parts) + "."
+        traits = ", ".join(
+            f"{label}: {design_system[key]}"
+            for key, label in DESIGN_SYSTEM_LABELS
+            if design_system.get(key)
+        )
+        design_context = f"Design system: {traits}."
 
     # Create artifact objects — positions set to 0; frontend dagre layout computes real positions
     plan_artifacts = []
+    artifact_ids: set[str] = set()
     temp_to_real: dict[str, str] = {}
     ui_screen_queue: list[dict] = []  # components with has_ui: true
     for comp in components:
@@ -89,6 +90,7 @@ async def run_plan(
             position_y=0,
         )
         plan_artifacts.append(artifact)
+        artifact_ids.add(real_id)
 
         # Track components that have UI
         if comp.get("has_ui") and comp.get("ui_description"):
@@ -98,11 +100,6 @@ async def run_plan(
                 "ui_description": comp["ui_description"],
             })
 
-        # Stream each artifact
-        await ws_manager.send_event(project_id, "plan_artifact_created", {
-            "artifact": artifact.model_dump(),
-        })
-
     # Create ui_screen companion artifacts
     ui_screen_artifacts = []
     ui_screen_connections_data = []
@@ -123,6 +120,7 @@ async def run_plan(
         )
         ui_screen_artifacts.append(screen_artifact)
         plan_artifacts.append(screen_artifact)
+        artifact_ids.add(screen_id)
 
         # Connection from ui_screen to its parent plan_component
         ui_screen_connections_data.append({
@@ -132,32 +130,41 @@ async def run_plan(
             "connection_type": "references",
         })
 
-        await ws_manager.send_event(project_id, "plan_artifact_created", {
-            "artifact": screen_artifact.model_dump(),
-        })
-
     if ui_screen_artifacts:
         logger.info("Created %d ui_screen artifacts", len(ui_screen_artifacts))
 
+    # Stream every card in one frame: one encode + socket write instead of N.
+    # The send runs in the background while connections are remapped.
+    # Dumped once; the same dicts feed image generation below.
+    artifact_dicts = [a.model_dump() for a in plan_artifacts]
+    cards_sent = asyncio.create_task(
+        ws_manager.send_raw(project_id, orjson.dumps({
+            "type": "plan_artifacts_created_batch",
+            "data": {"artifacts": artifact_dicts},
+        }, default=str))
+    )
+
     # Remap temp_ids to real artifact IDs in connections
-    remapped_connections = []
-    for conn_data in raw_connections:
-        from_id = temp_to_real.get(conn_data.get("from_id", ""), "")
-        to_id = temp_to_real.get(conn_data.get("to_id", ""), "")
-        if from_id and to_id:
-            remapped_connections.append({
-                "from_id": from_id,
-                "to_id": to_id,
-                "label": conn_data.get("label", ""),
-                "connection_type": conn_data.get("connection_type", "depends"),
-            })
+    real = temp_to_real.get
+    remapped_connections = [
+        {
+            "from_id": from_id,
+            "to_id": to_id,
+            "label": conn_data.get("label", ""),
+            "connection_type": conn_data.get("connection_type", "depends"),
+        }
+        for conn_data in raw_connections
+        for from_id, to_id in [(real(conn_data.get("from_id", "")), real(conn_data.get("to_id", "")))]
+        if from_id and to_id
+    ]
 
     # Add ui_screen connections
     remapped_connections.extend(ui_screen_connections_data)
 
     # Enforce DAG — remove any cycles
-    artifact_ids = {a.id for a in plan_artifacts}
-    dag_connections_data = remove_cycles(remapped_connections, artifact_ids)
+    dag_connections_data = remove_cycles(
+        remapped_connections, artifact_ids, insertion_order=[a.id for a in plan_artifacts],
+    )
 
     connections = []
     for conn_data in dag_connections_data:
@@ -170,7 +177,10 @@ async def run_plan(
         )
         connections.append(conn)
 
-    # Save to database
+    # Cards must reach clients before any frame that refers to them
+    await cards_sent
+
+    # Save to Supabase before image URL updates can target these rows
     try:
         await db.save_artifacts(plan_artifacts)
         if connections:
@@ -181,31 +191,34 @@ async def run_plan(
             "message": f"Failed to save plan: {str(e)}",
         })
 
-    # Broadcast connections
-    for conn in connections:
-        await ws_manager.send_event(project_id, "connection_created", conn.model_dump())
+    if connections:
+        await ws_manager.send_raw(project_id, orjson.dumps({
+            "type": "connections_created_batch",
+            "data": {"connections": [c.model_dump() for c in connections]},
+        }, default=str))
 
     # Generate images for plan components (skip mermaid artifacts)
-    imageable = [a for a in plan_artifacts if a.type != "mermaid"]
+    imageable = [d for d in artifact_dicts if d["type"] != "mermaid"]
     logger.info("Image generation starting for %d plan artifacts (skipping %d mermaid)", len(imageable), len(plan_artifacts) - len(imageable))
     await ws_manager.send_event(project_id, "images_generating", {
         "total": len(imageable),
     })
 
+    # Completed image URLs are coalesced into bulk UPDATEs + batched frames
+    image_updates = ImageUpdateBatcher(project_id, ws_manager)
+    image_updates.start()
+
     async def on_image_progress(artifact_id: str, success: bool, image_url: str | None):
         if success and image_url:
-            saved = await db.update_artifact_image(artifact_id, image_url)
-            if saved:
-                await ws_manager.send_event(project_id, "image_generated", {
-                    "artifact_id": artifact_id,
-                    "image_url": image_url,
-                })
-
-    artifact_dicts_for_images = [a.model_dump() for a in imageable]
-    await image_service.generate_images_parallel(
-        artifact_dicts_for_images, description, on_progress=on_image_progress,
-        design_context=design_context,
-    )
+            image_updates.add(artifact_id, image_url)
+
+    try:
+        await image_service.generate_images_parallel(
+            imageable, on_progress=on_image_progress,
+            design_context=design_context,
+        )
+    finally:
+        await image_updates.close()
 
     # Final event
     logger.info("Plan complete: %d components for project=%s", len(plan_artifacts), project_id)
@@ -27,11 +27,15 @@ def compute_layout(artifacts: list[Artifact], groups: list[dict]) -> tuple[list[
     """Compute grid positions for artifacts, grouped."""
     group_objects = []
     assigned_artifacts = set()
+    by_id = {a.id: a for a in artifacts}
 
     y_offset = 0
     for g_data in groups:
-        g_artifact_ids = g_data.get("artifact_ids", [])
-        group_artifacts = [a for a in artifacts if a.id in g_artifact_ids]
+        g_artifact_ids = g_data.get("artifact_ids")
+        if not g_artifact_ids:
+            continue
+        # dict.fromkeys dedupes while keeping the group's listed order
+        group_artifacts = [by_id[i] for i in dict.fromkeys(g_artifact_ids) if i in by_id]
 
         if not group_artifacts:
             continue
@@ -178,20 +182,25 @@ async def run_research(project_id: str, query: str, ws_manager: WSManager, *, co
         })
 
     # Broadcast groups and connections
-    for group in group_objects:
-        await ws_manager.send_event(project_id, "group_created", {
-            "group": group.model_dump(),
-        })
-
-    for conn in connections:
-        await ws_manager.send_event(project_id, "connection_created", {
-            "id": conn.id,
-            "project_id": conn.project_id,
-            "from_artifact_id": conn.from_artifact_id,
-            "to_artifact_id": conn.to_artifact_id,
-            "label": conn.label,
-            "connection_type": conn.connection_type,
-        })
+    await asyncio.gather(
+        *(
+            ws_manager.send_event(project_id, "group_created", {
+                "group": group.model_dump(),
+            })
+            for group in group_objects
+        ),
+        *(
+            ws_manager.send_event(project_id, "connection_created", {
+                "id": conn.id,
+                "project_id": conn.project_id,
+                "from_artifact_id": conn.from_artifact_id,
+                "to_artifact_id": conn.to_artifact_id,
+                "label": conn.label,
+                "connection_type": conn.connection_type,
+            })
+            for conn in connections
+        ),
+    )
 
     # Broadcast summary artifact
     await ws_manager.send_event(project_id, "artifact_created", {
@@ -218,31 +227,59 @@ async def run_research(project_id: str, query: str, ws_manager: WSManager, *, co
     except Exception as e:
         logger.error("Plan direction generation failed: %s", e)
 
-    # Step 5: Generate images as a fire-and-forget background task
-    logger.info("Image generation starting for %d artifacts", len(all_artifacts))
+    # Step 5: Generate images as a fire-and-forget background task.
+    # Image prompts only read these fields; a slim projection avoids a second
+    # full model_dump() and carries at most 200 chars of content per artifact.
+    # Artifacts that already have an image are left alone.
+    artifact_dicts_for_images = [
+        {
+            "id": a.id,
+            "project_id": a.project_id,
+            "type": a.type,
+            "title": a.title,
+            "summary": a.summary or a.content[:200],
+        }
+        for a in all_artifacts
+        if not a.image_url
+    ]
+
+    logger.info("Image generation starting for %d artifacts", len(artifact_dicts_for_images))
     await ws_manager.send_event(project_id, "images_generating", {
-        "total": len(all_artifacts),
+        "total": len(artifact_dicts_for_images),
     })
 
+    async def persist_and_broadcast(artifact_id: str, image_url: str):
+        saved = await db.update_artifact_image(artifact_id, image_url)
+        if saved:
+            await ws_manager.send_event(project_id, "image_generated", {
+                "artifact_id": artifact_id,
+                "image_url": image_url,
+            })
+
+    # The DB write + broadcast runs off the image worker so it can move on to
+    # the next artifact; the set keeps the tasks referenced until they finish.
+    pending_updates: set[asyncio.Task] = set()
+
     async def on_image_progress(artifact_id: str, success: bool, image_url: str | None):
         if success and image_url:
-            saved = await db.update_artifact_image(artifact_id, image_url)
-            if saved:
-                await ws_manager.send_event(project_id, "image_generated", {
-                    "artifact_id": artifact_id,
-                    "image_url": image_url,
-                })
-
-    artifact_dicts_for_images = [a.model_dump() for a in all_artifacts]
+            task = asyncio.create_task(persist_and_broadcast(artifact_id, image_url))
+            pending_updates.add(task)
+            task.add_done_callback(pending_updates.discard)
 
     async def _generate_images():
         try:
             await image_service.generate_images_parallel(
-                artifact_dicts_for_images, query, on_progress=on_image_progress
+                artifact_dicts_for_images, on_progress=on_image_progress
             )
         except Exception as e:
             logger.error("Image generation failed: %s", e)
         finally:
+            # Every image_generated event goes out before images_complete
+            if pending_updates:
+                results = await asyncio.gather(*pending_updates, return_exceptions=True)
+                for r in results:
+                    if isinstance(r, Exception):
+                        logger.error("Image update failed: %s", r)
             await ws_manager.send_event(project_id, "images_complete", {})
 
     asyncio.create_task(_generate_images())
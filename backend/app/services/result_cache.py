@@ -0,0 +1,48 @@
+"""Small in-process TTL + LRU cache for parsed LLM results."""
+
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+def cache_key(*parts: str) -> str:
+    """Stable digest of the prompt inputs that determine a result."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class TTLCache:
+    """Exact-key cache bounded by entry count and age.
+
+    Values are deep-copied on the way in and out so callers can mutate
+    what they get back without corrupting the cached copy.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl_seconds: float = 24 * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at >= self.ttl:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic(), copy.deepcopy(value))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
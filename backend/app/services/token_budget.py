@@ -0,0 +1,50 @@
+"""Rolling-window token budget for rate-limited LLM APIs."""
+
+import asyncio
+import time
+from collections import deque
+
+
+class TokenBudgetTracker:
+    """Tracks tokens spent over a rolling window and admits requests that fit.
+
+    Anthropic throttles on tokens-per-minute as well as requests-per-minute;
+    a semaphore alone over-admits large calls. Callers acquire an estimated
+    cost before sending and correct it with actual usage afterwards.
+    A limit of 0 disables tracking.
+    """
+
+    def __init__(self, tokens_per_minute: int, window_seconds: float = 60.0):
+        self.limit = tokens_per_minute
+        self.window = window_seconds
+        self._entries: deque[tuple[float, int]] = deque()
+        self._used = 0
+        self._lock = asyncio.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._entries and now - self._entries[0][0] >= self.window:
+            _, tokens = self._entries.popleft()
+            self._used -= tokens
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until `tokens` fits in the current window, then record it."""
+        if self.limit <= 0:
+            return
+        # A single request larger than the whole budget would never fit
+        tokens = min(tokens, self.limit)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                if self._used + tokens <= self.limit:
+                    self._entries.append((now, tokens))
+                    self._used += tokens
+                    return
+                await asyncio.sleep(self._entries[0][0] + self.window - now)
+
+    def record_correction(self, delta: int) -> None:
+        """Adjust the window by (actual - estimated) tokens once usage is known."""
+        if self.limit <= 0 or delta == 0:
+            return
+        self._entries.append((time.monotonic(), delta))
+        self._used += delta
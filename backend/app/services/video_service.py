@@ -1,19 +1,24 @@
 """Remotion video generation service."""
 
 import asyncio
-import json
 import logging
 import os
 import tempfile
 import uuid
+from collections import OrderedDict
+
+import orjson
 
 from app.db.supabase import get_db
 from app.services.dag_utils import topological_sort_layers
 
 logger = logging.getLogger(__name__)
 
-# Video job tracking (in-memory for now)
-_video_jobs: dict[str, dict] = {}
+# Video job tracking (in-memory for now), least recently used first
+MAX_VIDEO_JOBS = 200
+_video_jobs: OrderedDict[str, dict] = OrderedDict()
+# Newest job per (project_id, phase), plus (project_id, None) for any phase
+_latest_job_by_project: dict[tuple[str, str | None], str] = {}
 
 VIDEO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "static", "videos")
 REMOTION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "video")
@@ -31,6 +36,10 @@ async def generate_video(project_id: str, phase: str = "research") -> str:
         "status": "rendering",
         "url": None,
     }
+    _latest_job_by_project[(project_id, phase)] = job_id
+    _latest_job_by_project[(project_id, None)] = job_id
+    while len(_video_jobs) > MAX_VIDEO_JOBS:
+        _video_jobs.popitem(last=False)
 
     # Run rendering in background
     asyncio.create_task(_render_video(job_id, project_id, phase))
@@ -39,6 +48,8 @@ async def generate_video(project_id: str, phase: str = "research") -> str:
 
 async def _render_video(job_id: str, project_id: str, phase: str = "research") -> None:
     """Fetch data, compute topological order, render via Remotion."""
+    # Held directly so updates still land if the job is evicted mid-render
+    job = _video_jobs[job_id]
     try:
         db = get_db()
 
@@ -112,14 +123,6 @@ async def _render_video(job_id: str, project_id: str, phase: str = "research") -
             "connections": conn_dicts,
         }
 
-        # Write props to temp file
-        os.makedirs(VIDEO_DIR, exist_ok=True)
-        props_file = tempfile.NamedTemporaryFile(
-            mode="w", suffix=".json", delete=False
-        )
-        json.dump(props, props_file)
-        props_file.close()
-
         output_filename = f"{project_id}_{job_id[:8]}.mp4"
         output_path = os.path.join(VIDEO_DIR, output_filename)
 
@@ -130,32 +133,37 @@ async def _render_video(job_id: str, project_id: str, phase: str = "research") -
                 "Remotion CLI not found at %s. Run 'npm install' in the video/ directory.",
                 remotion_bin,
             )
-            _video_jobs[job_id]["status"] = "error"
-            os.unlink(props_file.name)
+            job["status"] = "error"
             return
 
-        # Shell out to Remotion
-        cmd = [
-            "npx", "remotion", "render",
-            "ResearchVideo", output_path,
-            "--props", props_file.name,
-        ]
-
-        logger.info("Rendering video: %s", " ".join(cmd))
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            cwd=REMOTION_DIR,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-
-        # Clean up props file
-        os.unlink(props_file.name)
+        # Write props to temp file
+        os.makedirs(VIDEO_DIR, exist_ok=True)
+        fd, props_path = tempfile.mkstemp(suffix=".json")
+        try:
+            with os.fdopen(fd, "wb") as props_file:
+                props_file.write(orjson.dumps(props, option=orjson.OPT_NON_STR_KEYS))
+
+            # Shell out to Remotion
+            cmd = [
+                "npx", "remotion", "render",
+                "ResearchVideo", output_path,
+                "--props", props_path,
+            ]
+
+            logger.info("Rendering video: %s", " ".join(cmd))
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=REMOTION_DIR,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await proc.communicate()
+        finally:
+            os.unlink(props_path)
 
         if proc.returncode != 0:
             logger.error("Remotion render failed: %s", stderr.decode())
-            _video_jobs[job_id]["status"] = "error"
+            job["status"] = "error"
             return
 
         # Upload to Supabase Storage (sync call, run in thread)
@@ -167,20 +175,23 @@ async def _render_video(job_id: str, project_id: str, phase: str = "research") -
         except OSError:
             logger.warning("Could not delete local video file: %s", output_path)
 
-        _video_jobs[job_id]["status"] = "complete"
-        _video_jobs[job_id]["url"] = video_url
+        job["status"] = "complete"
+        job["url"] = video_url
         logger.info("Video uploaded to Supabase Storage: %s", video_url)
 
     except Exception as e:
         logger.error("Video generation failed for project=%s: %s", project_id, e)
-        _video_jobs[job_id]["status"] = "error"
+        job["status"] = "error"
 
 
 async def get_video_status(project_id: str, phase: str | None = None) -> dict:
     """Get the latest video generation status for a project."""
-    for job_id, job in reversed(list(_video_jobs.items())):
-        if job["project_id"] == project_id:
-            if phase and job.get("phase") != phase:
-                continue
-            return {"status": job["status"], "url": job.get("url"), "job_id": job_id}
-    return {"status": "none", "url": None, "job_id": None}
+    key = (project_id, phase or None)
+    job_id = _latest_job_by_project.get(key)
+    job = _video_jobs.get(job_id) if job_id else None
+    if job is None:
+        if job_id:
+            del _latest_job_by_project[key]  # evicted
+        return {"status": "none", "url": None, "job_id": None}
+    _video_jobs.move_to_end(job_id)
+    return {"status": job["status"], "url": job.get("url"), "job_id": job_id}
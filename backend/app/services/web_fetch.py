@@ -1,10 +1,50 @@
 """Web page fetcher with content extraction using readability."""
 
+import re
+from html import unescape
+
 import httpx
 from pydantic import BaseModel
+from lxml import html as lxml_html
 from lxml.html.clean import Cleaner
 from readability import Document
 
+# Readability only needs the top of a page to find its main content; anything
+# past this is read but never decoded or parsed.
+MAX_BODY_BYTES = 512 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Cleaner holds only configuration, so one instance serves every fetch.
+_CLEANER = Cleaner(
+    scripts=True,
+    javascript=True,
+    comments=True,
+    style=True,
+    links=False,
+    meta=True,
+    page_structure=False,
+    processing_instructions=True,
+    embedded=True,
+    frames=True,
+    forms=True,
+    annoying_tags=True,
+    remove_tags=None,
+    allow_tags=None,
+    remove_unknown_tags=True,
+    safe_attrs_only=True,
+)
+
+# Any whitespace run holding a line boundary (as str.splitlines sees them),
+# so blank and whitespace-only lines collapse to a single newline
+_WS_RE = re.compile(r"\s*[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]\s*")
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_TEXT_RE = re.compile(r"<(script|style|title)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+
+# Below this size a page is a stub or redirect shell; stripping tags with a
+# regex is far cheaper than readability + lxml and loses nothing useful.
+SHORT_HTML_CHARS = 4096
+
 
 class FetchResult(BaseModel):
     url: str
@@ -14,6 +54,31 @@ class FetchResult(BaseModel):
     truncated: bool
 
 
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Shared client so repeat fetches reuse pooled keep-alive connections."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=100),
+            timeout=20.0,
+            follow_redirects=True,
+            max_redirects=5,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Release the shared fetch client (called on app shutdown)."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
 async def fetch_and_parse(url: str, max_chars: int = 10000) -> FetchResult:
     """Fetch a web page and extract its main content.
 
@@ -29,55 +94,51 @@ async def fetch_and_parse(url: str, max_chars: int = 10000) -> FetchResult:
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     }
 
-    async with httpx.AsyncClient(
-        timeout=20.0,
-        follow_redirects=True,
-        max_redirects=5,
-    ) as client:
-        response = await client.get(url, headers=headers)
+    client = _get_client()
+    async with client.stream("GET", url, headers=headers) as response:
         response.raise_for_status()
-        html = response.text
-
-    # Use readability to extract main content
-    doc = Document(html)
-    title = doc.title() or ""
-    summary_html = doc.summary()
-
-    # Clean HTML to plain text
-    cleaner = Cleaner(
-        scripts=True,
-        javascript=True,
-        comments=True,
-        style=True,
-        links=False,
-        meta=True,
-        page_structure=False,
-        processing_instructions=True,
-        embedded=True,
-        frames=True,
-        forms=True,
-        annoying_tags=True,
-        remove_tags=None,
-        allow_tags=None,
-        remove_unknown_tags=True,
-        safe_attrs_only=True,
-    )
+        content_type = response.headers.get("content-type", "").lower()
+        if not content_type.startswith(HTML_CONTENT_TYPES):
+            return FetchResult(
+                url=str(response.url),
+                content="",
+                title="",
+                status=response.status_code,
+                truncated=False,
+            )
+
+        raw = bytearray()
+        body_capped = False
+        async for chunk in response.aiter_bytes():
+            raw += chunk
+            if len(raw) > MAX_BODY_BYTES:
+                body_capped = True
+                break
+        html = raw[:MAX_BODY_BYTES].decode(response.encoding or "utf-8", errors="replace")
+
+    if len(html) < SHORT_HTML_CHARS:
+        match = _TITLE_RE.search(html)
+        title = unescape(match.group(1)).strip() if match else ""
+        text = unescape(_TAG_RE.sub("", _NON_TEXT_RE.sub("", html)))
+    else:
+        # Use readability to extract main content
+        doc = Document(html)
+        title = doc.title() or ""
+        summary_html = doc.summary()
+
+        # Parse the extracted article once and clean the tree in place, rather
+        # than clean_html() serializing it back to a string for a second parse.
+        try:
+            doc_tree = lxml_html.fromstring(summary_html)
+            _CLEANER(doc_tree)
+            text = doc_tree.text_content()
+        except Exception:
+            # Fallback: strip HTML tags manually
+            text = _TAG_RE.sub("", summary_html)
+
+    text = _WS_RE.sub("\n", text).strip()
 
-    try:
-        from lxml import html as lxml_html
-        cleaned = cleaner.clean_html(summary_html)
-        doc_tree = lxml_html.fromstring(cleaned)
-        text = doc_tree.text_content()
-    except Exception:
-        # Fallback: strip HTML tags manually
-        import re
-        text = re.sub(r"<[^>]+>", "", summary_html)
-
-    # Clean up whitespace
-    lines = [line.strip() for line in text.splitlines()]
-    text = "\n".join(line for line in lines if line)
-
-    truncated = len(text) > max_chars
+    truncated = body_capped or len(text) > max_chars
     if truncated:
         text = text[:max_chars] + "\n\n[Content truncated]"
 
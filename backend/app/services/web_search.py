@@ -1,8 +1,16 @@
 """Brave Search API client for web research."""
 
+import logging
+
 import httpx
 from pydantic import BaseModel
 from app.config import get_settings
+from app.services.result_cache import TTLCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+# Agents across projects frequently issue the same sub-queries
+_search_cache = TTLCache(maxsize=2048, ttl_seconds=3600)
 
 
 class SearchResult(BaseModel):
@@ -11,6 +19,29 @@ class SearchResult(BaseModel):
     snippet: str
 
 
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Shared client; concurrent searches multiplex over one HTTP/2 connection."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=100),
+            timeout=15.0,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Release the shared search client (called on app shutdown)."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
 async def search(query: str, count: int = 5) -> list[SearchResult]:
     """Search the web using Brave Search API.
 
@@ -25,6 +56,13 @@ async def search(query: str, count: int = 5) -> list[SearchResult]:
     if not settings.BRAVE_API_KEY:
         raise ValueError("BRAVE_API_KEY not configured")
 
+    key = cache_key(" ".join(query.lower().split()), str(count))
+    cached = _search_cache.get(key)
+    if cached is not None:
+        logger.debug("web_search cache HIT: %r", query)
+        return cached
+    logger.debug("web_search cache MISS: %r", query)
+
     headers = {
         "Accept": "application/json",
         "Accept-Encoding": "gzip",
@@ -38,14 +76,14 @@ async def search(query: str, count: int = 5) -> list[SearchResult]:
         "search_lang": "en",
     }
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        response = await client.get(
-            "https://api.search.brave.com/res/v1/web/search",
-            headers=headers,
-            params=params,
-        )
-        response.raise_for_status()
-        data = response.json()
+    client = _get_client()
+    response = await client.get(
+        "https://api.search.brave.com/res/v1/web/search",
+        headers=headers,
+        params=params,
+    )
+    response.raise_for_status()
+    data = response.json()
 
     results = []
     for item in data.get("web", {}).get("results", []):
@@ -57,4 +95,6 @@ async def search(query: str, count: int = 5) -> list[SearchResult]:
             )
         )
 
-    return results[:count]
+    results = results[:count]
+    _search_cache.set(key, results)
+    return results
@@ -1,10 +1,14 @@
-import json
 import logging
+
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 from app.ws.manager import WSManager
 
 logger = logging.getLogger(__name__)
 
+# Constant reply, encoded once
+_PONG = orjson.dumps({"type": "pong"}).decode()
+
 
 async def handle_project_ws(project_id: str, websocket: WebSocket, ws_manager: WSManager):
     """Handle a WebSocket connection for a project."""
@@ -15,12 +19,12 @@ async def handle_project_ws(project_id: str, websocket: WebSocket, ws_manager: W
             # Keep connection alive, handle any client messages
             data = await websocket.receive_text()
             try:
-                msg = json.loads(data)
+                msg = orjson.loads(data)
                 # Handle client messages (e.g., ping)
                 if msg.get("type") == "ping":
                     logger.debug("Ping received for project=%s", project_id)
-                    await websocket.send_text(json.dumps({"type": "pong"}))
-            except json.JSONDecodeError:
+                    await websocket.send_text(_PONG)
+            except orjson.JSONDecodeError:
                 pass
     except (WebSocketDisconnect, RuntimeError):
         pass
@@ -1,76 +1,126 @@
-import json
 import asyncio
 import logging
 import time
 from fastapi import WebSocket
-from collections import defaultdict
+from collections import defaultdict, deque
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
+BROADCAST_BATCH = 50
+EVENT_BUFFER_MAX = 1000  # per project, bounds memory during bursts
+
+
+def _dumps(data: dict) -> str:
+    # Text frames: every client JSON.parses string messages, so the orjson
+    # bytes are decoded once here rather than sent as binary.
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
 
 class WSManager:
-    """Manages WebSocket connections per project."""
+    """Manages WebSocket connections per project.
+
+    Connection bookkeeping never awaits mid-update, so it runs lock-free on
+    the event loop; broadcasts work from a snapshot of the set.
+    """
 
     def __init__(self):
-        self._connections: dict[str, list[WebSocket]] = defaultdict(list)
-        self._lock = asyncio.Lock()
-        self._event_buffer: dict[str, list[tuple[float, dict]]] = defaultdict(list)
+        self._connections: dict[str, set[WebSocket]] = defaultdict(set)
+        # Events are buffered as their encoded JSON text, so replay splices
+        # them without re-encoding and later mutation of a caller's dict
+        # can't change what gets replayed.
+        self._event_buffer: dict[str, deque[tuple[float, str]]] = defaultdict(
+            lambda: deque(maxlen=EVENT_BUFFER_MAX)
+        )
         self._buffer_ttl = 60  # seconds
 
     async def connect(self, project_id: str, websocket: WebSocket):
         await websocket.accept()
-        # Replay buffered events to the new connection
-        now = time.time()
-        for ts, payload in self._event_buffer.get(project_id, []):
-            if now - ts < self._buffer_ttl:
-                try:
-                    await websocket.send_text(json.dumps(payload, default=str))
-                except Exception:
-                    logger.warning("Failed to replay event to new WS client: project=%s", project_id)
-                    return  # connection already dead
-        async with self._lock:
-            self._connections[project_id].append(websocket)
+        # Replay buffered events to the new connection as one bundled frame,
+        # spliced from the already-encoded event texts.
+        now = time.monotonic()
+        live = [
+            payload for ts, payload in self._event_buffer.get(project_id, ())
+            if now - ts < self._buffer_ttl
+        ]
+        if live:
+            message = live[0] if len(live) == 1 else '{"type":"replay","data":[' + ",".join(live) + "]}"
+            try:
+                await websocket.send_text(message)
+            except Exception:
+                logger.warning("Failed to replay events to new WS client: project=%s", project_id)
+                return  # connection already dead
+        self._connections[project_id].add(websocket)
         logger.info("WS client connected: project=%s (replayed buffered events)", project_id)
 
     async def disconnect(self, project_id: str, websocket: WebSocket):
-        async with self._lock:
-            if websocket in self._connections[project_id]:
-                self._connections[project_id].remove(websocket)
-                if not self._connections[project_id]:
-                    del self._connections[project_id]
+        conns = self._connections.get(project_id)
+        if conns is not None:
+            conns.discard(websocket)
+            if not conns:
+                del self._connections[project_id]
         logger.info("WS client disconnected: project=%s", project_id)
 
     async def broadcast(self, project_id: str, data: dict):
         """Send a JSON message to all connections for a project."""
-        message = json.dumps(data, default=str)
-        async with self._lock:
-            connections = list(self._connections.get(project_id, []))
+        if not self._connections.get(project_id):
+            return
+        await self._broadcast_text(project_id, _dumps(data))
 
+    async def _broadcast_text(self, project_id: str, message: str):
+        conns = self._connections.get(project_id)
+        if not conns:
+            return
+        connections = list(conns)
+
+        # Send to every client concurrently so one slow socket doesn't hold up
+        # the rest; yield between batches so huge fan-outs don't hog the loop.
         disconnected = []
-        for ws in connections:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                disconnected.append(ws)
+        for start in range(0, len(connections), BROADCAST_BATCH):
+            if start:
+                await asyncio.sleep(0)
+            batch = connections[start:start + BROADCAST_BATCH]
+            results = await asyncio.gather(
+                *(ws.send_text(message) for ws in batch), return_exceptions=True
+            )
+            disconnected.extend(ws for ws, r in zip(batch, results) if isinstance(r, Exception))
 
         if disconnected:
             logger.warning("Cleaning up %d stale WS connections for project=%s", len(disconnected), project_id)
-            async with self._lock:
-                for ws in disconnected:
-                    if ws in self._connections[project_id]:
-                        self._connections[project_id].remove(ws)
+            conns = self._connections.get(project_id)
+            if conns is not None:
+                conns.difference_update(disconnected)
+                if not conns:
+                    del self._connections[project_id]
 
-    async def send_event(self, project_id: str, event_type: str, data: dict):
-        """Send a typed event to all connections for a project."""
-        payload = {"type": event_type, "data": data}
-        # Buffer the event
-        now = time.time()
+    def _buffer_event(self, project_id: str, payload: str):
+        now = time.monotonic()
         buf = self._event_buffer[project_id]
         buf.append((now, payload))
-        # Prune expired entries
-        self._event_buffer[project_id] = [(t, d) for t, d in buf if now - t < self._buffer_ttl]
+        # Prune expired entries (oldest first, so stop at the first live one)
+        while now - buf[0][0] >= self._buffer_ttl:
+            buf.popleft()
+
+    async def send_event(self, project_id: str, event_type: str, data: dict):
+        """Send a typed event to all connections for a project."""
+        message = _dumps({"type": event_type, "data": data})
+        self._buffer_event(project_id, message)
+        if not self._connections.get(project_id):
+            logger.debug("WS event buffered: type=%s project=%s (no listeners)", event_type, project_id)
+            return
         logger.debug("WS event: type=%s project=%s (buffer=%d)", event_type, project_id, len(self._event_buffer[project_id]))
-        await self.broadcast(project_id, payload)
+        await self._broadcast_text(project_id, message)
+
+    async def send_raw(self, project_id: str, message: bytes | str):
+        """Buffer and broadcast an already-serialized {"type", "data"} event.
+
+        Lets callers encode large payloads once (e.g. with orjson). Sent as a
+        text frame, since clients JSON.parse string messages.
+        """
+        text = message.decode() if isinstance(message, bytes) else message
+        self._buffer_event(project_id, text)
+        await self._broadcast_text(project_id, text)
 
 
 # Singleton
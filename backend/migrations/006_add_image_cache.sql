@@ -0,0 +1,6 @@
+-- Content-addressed cache of generated images, keyed by sha256 of the Gemini prompt
+CREATE TABLE IF NOT EXISTS image_cache (
+    prompt_hash TEXT PRIMARY KEY,
+    image_url TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
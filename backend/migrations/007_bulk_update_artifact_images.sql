@@ -0,0 +1,10 @@
+-- Set image_url on many artifacts in one statement (called via RPC)
+CREATE OR REPLACE FUNCTION bulk_update_artifact_images(updates JSONB)
+RETURNS void
+LANGUAGE sql
+AS $$
+    UPDATE artifacts AS a
+    SET image_url = u.image_url
+    FROM jsonb_to_recordset(updates) AS u(id TEXT, image_url TEXT)
+    WHERE a.id = u.id;
+$$;
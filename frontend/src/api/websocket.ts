@@ -20,7 +20,11 @@ export class ProjectWebSocket {
     this.ws.onmessage = (event) => {
       try {
         const parsed = JSON.parse(event.data);
-        this.handlers.forEach((h) => h(parsed));
+        // Buffered events are replayed on connect as one bundled frame
+        const events = parsed.type === "replay" ? parsed.data : [parsed];
+        for (const e of events) {
+          this.handlers.forEach((h) => h(e));
+        }
       } catch {
         // ignore invalid messages
       }
@@ -61,6 +61,34 @@ export function useWebSocket(projectId: string | null) {
           break;
         }
 
+        case "plan_artifacts_created_batch": {
+          const artifacts = event.data.artifacts as unknown as Artifact[];
+          for (const artifact of artifacts) {
+            store.addArtifact(artifact);
+            store.addPlanStage({
+              id: artifact.id,
+              label: artifact.title,
+              status: "complete",
+              detail: artifact.type,
+            });
+          }
+          break;
+        }
+
+        case "connections_created_batch": {
+          const conns = event.data.connections as unknown as ArtifactConnection[];
+          for (const conn of conns) {
+            store.addConnection(conn);
+            store.addPlanStage({
+              id: conn.id,
+              label: conn.label || "Connection",
+              status: "complete",
+              detail: "connection",
+            });
+          }
+          break;
+        }
+
         case "group_created":
           store.addGroup(event.data.group as unknown as Group);
           break;
@@ -101,6 +129,21 @@ export function useWebSocket(projectId: string | null) {
           }
           break;
 
+        case "images_updated_batch": {
+          const images = event.data.images as { artifact_id: string; image_url: string }[];
+          for (const { artifact_id, image_url } of images) {
+            store.updateArtifactImage(artifact_id, image_url);
+            store.incrementImageGeneration();
+          }
+          const progress = useProjectStore.getState().imageGenerationProgress;
+          if (progress) {
+            store.updatePlanStage("images", {
+              detail: `${progress.completed}/${progress.total}`,
+            });
+          }
+          break;
+        }
+
         case "artifact_updated":
           store.updateArtifact(event.data.artifact as unknown as Artifact);
           store.setRegenerating(null);
@@ -1,13 +1,18 @@
 """MCP server exposing MVP tools for Claude Code integration."""
 
 import asyncio
-import json
+import io
+import itertools
 import logging
 import os
 import webbrowser
+from collections import ChainMap, defaultdict
+from collections.abc import Callable
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import httpx
+import orjson
 import websockets
 from mcp.server.fastmcp import FastMCP
 
@@ -18,58 +23,225 @@ BACKEND_URL = os.environ.get("MVP_BACKEND_URL", "http://localhost:8000")
 WS_URL = BACKEND_URL.replace("http://", "ws://").replace("https://", "wss://")
 FRONTEND_URL = os.environ.get("MVP_FRONTEND_URL", "http://localhost:5173")
 
-mcp = FastMCP("mvp", instructions="MVP: AI-powered research and product blueprint system")
+_client: httpx.AsyncClient | None = None
+# Request bodies are encoded with orjson and sent as content=
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Shared backend client: every tool call reuses pooled keep-alive connections."""
+    global _client
+    if _client is None:
+        # HTTP/2 is negotiated via ALPN, so concurrent tool calls multiplex
+        # over one connection to a TLS/h2 backend; plain http:// stays on 1.1.
+        _client = httpx.AsyncClient(
+            base_url=BACKEND_URL,
+            http2=True,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=100),
+        )
+    return _client
+
+
+class _ProjectEvents:
+    """A project WebSocket kept open across tool calls.
+
+    A reader task decodes every frame into a queue, so frames that arrive
+    between tool calls can be discarded before the next run starts. A None
+    in the queue marks the connection as closed.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.queue: asyncio.Queue[dict | None] = asyncio.Queue()
+        self._reader = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, project_id: str) -> "_ProjectEvents":
+        ws = await websockets.connect(
+            f"{WS_URL}/ws/projects/{project_id}",
+            # Small JSON frames over a near-loopback link: deflate costs more
+            # CPU than it saves. Plan batches can exceed the 1 MiB default.
+            compression=None,
+            max_size=2**24,
+            ping_interval=20,
+            ping_timeout=20,
+        )
+        return cls(ws)
+
+    async def _read(self) -> None:
+        try:
+            async for raw in self.ws:
+                for msg in _decode_events(raw):
+                    self.queue.put_nowait(msg)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.queue.put_nowait(None)
+
+    @property
+    def closed(self) -> bool:
+        return self._reader.done()
+
+    def discard_pending(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    async def recv(self) -> dict:
+        msg = await self.queue.get()
+        if msg is None:
+            raise ConnectionError("Project WebSocket closed")
+        return msg
 
+    async def close(self) -> None:
+        self._reader.cancel()
+        await self.ws.close()
 
-def _api_url(path: str) -> str:
-    return f"{BACKEND_URL}{path}"
+
+_ws_cache: dict[str, _ProjectEvents] = {}
+_ws_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+@asynccontextmanager
+async def _project_events(project_id: str):
+    """Hold the project's cached WebSocket, (re)connecting if needed.
+
+    The lock keeps concurrent tool calls on one project from consuming each
+    other's events.
+    """
+    async with _ws_locks[project_id]:
+        events = _ws_cache.get(project_id)
+        if events is None or events.closed:
+            events = _ws_cache[project_id] = await _ProjectEvents.connect(project_id)
+        else:
+            events.discard_pending()
+        yield events
+
+
+def _read(resp: httpx.Response):
+    """Parse a JSON response body from raw bytes with orjson."""
+    return orjson.loads(resp.content)
+
+
+# url -> (ETag, parsed body) of the last 200 for each conditional GET
+MAX_ETAG_ENTRIES = 256
+_etag_cache: dict[str, tuple[str, object]] = {}
+
+
+async def _get_json(path: str, **kwargs):
+    """GET and parse a backend JSON resource, revalidating with If-None-Match.
+
+    A 304 reuses the body parsed on the last 200, so a repeat call costs
+    neither the download nor the parse. Callers must not mutate the result.
+    """
+    client = _get_client()
+    request = client.build_request("GET", path, **kwargs)
+    key = str(request.url)
+    cached = _etag_cache.get(key)
+    if cached is not None:
+        request.headers["If-None-Match"] = cached[0]
+
+    resp = await client.send(request)
+    if resp.status_code == 304 and cached is not None:
+        return cached[1]
+    resp.raise_for_status()
+
+    data = _read(resp)
+    etag = resp.headers.get("etag")
+    if etag:
+        _etag_cache.pop(key, None)
+        _etag_cache[key] = (etag, data)
+        if len(_etag_cache) > MAX_ETAG_ENTRIES:
+            del _etag_cache[next(iter(_etag_cache))]
+    return data
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    global _client
+    try:
+        yield
+    finally:
+        client, _client = _client, None
+        if client is not None:
+            await client.aclose()
+        cached = list(_ws_cache.values())
+        _ws_cache.clear()
+        for events in cached:
+            await events.close()
+
+
+mcp = FastMCP(
+    "mvp",
+    instructions="MVP: AI-powered research and product blueprint system",
+    lifespan=_lifespan,
+)
+
+
+def _decode_events(raw: str | bytes) -> list[dict]:
+    """Parse one WS frame into events, unwrapping a bundled replay frame."""
+    try:
+        msg = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return []
+    if msg.get("type") == "replay":
+        return msg.get("data", [])
+    return [msg]
+
+
+# Frozen templates: one format_map per item, with ChainMap supplying the
+# optional lines and defaults without copying the item dict.
+_PROJECT_TEMPLATE = "- **{title}** (`{id}`) — phase: {phase}"
+_PROJECT_DEFAULTS = {"phase": "research"}
+_ART_TEMPLATE = (
+    "### {title} (`{id}`)\n"
+    "**Type:** {type} | **Importance:** {importance}/100{summary_line}{source_line}"
+)
+_ART_DEFAULTS = {"type": "unknown", "importance": 50}
 
 
 def _format_project(p: dict) -> str:
-    phase = p.get("phase", "research")
-    return f"- **{p['title']}** (`{p['id']}`) — phase: {phase}"
+    return _PROJECT_TEMPLATE.format_map(ChainMap(p, _PROJECT_DEFAULTS))
 
 
-def _format_artifact(a: dict) -> str:
-    lines = [f"### {a['title']} (`{a['id']}`)"]
-    lines.append(f"**Type:** {a.get('type', 'unknown')} | **Importance:** {a.get('importance', 50)}/100")
-    if a.get("summary"):
-        lines.append(a["summary"])
-    if a.get("source_url"):
-        lines.append(f"Source: {a['source_url']}")
-    return "\n".join(lines)
+def _write_artifact(a: dict, w: Callable[[str], object]) -> None:
+    summary = a.get("summary")
+    source = a.get("source_url")
+    w(_ART_TEMPLATE.format_map(ChainMap(
+        {
+            "summary_line": f"\n{summary}" if summary else "",
+            "source_line": f"\nSource: {source}" if source else "",
+        },
+        a,
+        _ART_DEFAULTS,
+    )))
 
 
 async def _wait_for_ws_event(
     project_id: str,
     completion_event: str,
-    timeout: float = 300,
+    timeout: float | None = None,
 ) -> list[dict]:
-    """Connect to project WebSocket and collect events until completion."""
-    ws_url = f"{WS_URL}/ws/projects/{project_id}"
-    collected: list[dict] = []
-
-    async with websockets.connect(ws_url) as ws:
-        while True:
-            try:
-                raw = await asyncio.wait_for(ws.recv(), timeout=timeout)
-            except asyncio.TimeoutError:
-                collected.append({"type": "timeout", "data": {"message": "Operation timed out after 5 minutes"}})
-                break
+    """Collect events from the project WebSocket until completion.
 
-            try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
-                continue
+    With timeout=None the loop waits indefinitely; otherwise one deadline
+    covers the whole run.
+    """
+    collected: list[dict] = []
 
-            event_type = msg.get("type", "")
-            collected.append(msg)
-            logger.info("WS event: %s", event_type)
+    async with _project_events(project_id) as events:
+        try:
+            async with asyncio.timeout(timeout):
+                while True:
+                    msg = await events.recv()
+                    event_type = msg.get("type", "")
+                    collected.append(msg)
+                    logger.info("WS event: %s", event_type)
 
-            if event_type == completion_event:
-                break
-            if event_type == "error":
-                break
+                    if event_type in (completion_event, "error"):
+                        break
+        except TimeoutError:
+            collected.append({"type": "timeout", "data": {"message": f"Operation timed out after {timeout:g}s"}})
 
     return collected
 
@@ -80,16 +252,10 @@ async def _wait_for_ws_event(
 @mcp.tool()
 async def list_projects() -> str:
     """List all MVP projects."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(_api_url("/api/projects"))
-        resp.raise_for_status()
-    projects = resp.json()
+    projects = await _get_json("/api/projects")
     if not projects:
         return "No projects found."
-    lines = ["# Projects\n"]
-    for p in projects:
-        lines.append(_format_project(p))
-    return "\n".join(lines)
+    return "\n".join(itertools.chain(["# Projects\n"], map(_format_project, projects)))
 
 
 @mcp.tool()
@@ -100,13 +266,14 @@ async def create_project(title: str, description: str = "") -> str:
         title: Project name / research topic
         description: What you want to build (optional)
     """
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            _api_url("/api/projects"),
-            json={"title": title, "description": description},
-        )
-        resp.raise_for_status()
-    proj = resp.json()
+    client = _get_client()
+    resp = await client.post(
+        "/api/projects",
+        content=orjson.dumps({"title": title, "description": description}),
+        headers=_JSON_HEADERS,
+    )
+    resp.raise_for_status()
+    proj = _read(resp)
     return f"Project created: **{proj['title']}** (`{proj['id']}`)"
 
 
@@ -118,13 +285,15 @@ async def get_clarifying_questions(topic: str, description: str = "") -> str:
         topic: The research topic or project name
         description: Description of what to build (optional)
     """
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(
-            _api_url("/api/clarify"),
-            json={"query": topic, "description": description},
-        )
-        resp.raise_for_status()
-    data = resp.json()
+    client = _get_client()
+    resp = await client.post(
+        "/api/clarify",
+        content=orjson.dumps({"query": topic, "description": description}),
+        headers=_JSON_HEADERS,
+        timeout=60,
+    )
+    resp.raise_for_status()
+    data = _read(resp)
     questions = data.get("questions", [])
     if not questions:
         return "No clarifying questions generated."
@@ -146,65 +315,60 @@ async def start_research(project_id: str, query: str, context: dict | None = Non
         query: Research query / topic
         context: Optional dict of clarifying question answers
     """
-    # Connect WebSocket first, then fire the POST
-    ws_url = f"{WS_URL}/ws/projects/{project_id}"
-    collected: list[dict] = []
-
-    async with websockets.connect(ws_url) as ws:
+    # Connect WebSocket first, then fire the POST. Events are classified as
+    # they arrive; only the first few artifacts are kept for the preview.
+    preview: list[dict] = []
+    artifact_count = 0
+    error_message: str | None = None
+    summary_text = ""
+
+    async with _project_events(project_id) as events:
         # Fire the research request
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                _api_url(f"/api/projects/{project_id}/research"),
-                json={"query": query, "context": context or {}},
-            )
-            resp.raise_for_status()
+        client = _get_client()
+        resp = await client.post(
+            f"/api/projects/{project_id}/research",
+            content=orjson.dumps({"query": query, "context": context or {}}, option=orjson.OPT_NON_STR_KEYS),
+            headers=_JSON_HEADERS,
+        )
+        resp.raise_for_status()
 
         # Collect events until research_complete or error
-        while True:
-            try:
-                raw = await asyncio.wait_for(ws.recv(), timeout=300)
-            except asyncio.TimeoutError:
-                collected.append({"type": "timeout", "data": {"message": "Research timed out"}})
-                break
-            try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
-                continue
-
-            event_type = msg.get("type", "")
-            collected.append(msg)
-
-            if event_type == "research_complete":
-                break
-            if event_type == "error":
-                break
-
-    # Format summary
-    artifacts = [
-        m["data"].get("artifact", m.get("data", {}))
-        for m in collected
-        if m.get("type") in ("artifact_created",)
-    ]
-    errors = [m for m in collected if m.get("type") == "error"]
-
-    if errors:
-        return f"Research failed: {errors[0].get('data', {}).get('message', 'Unknown error')}"
-
-    complete_msg = next((m for m in collected if m["type"] == "research_complete"), None)
-    summary_text = complete_msg["data"].get("summary", "") if complete_msg else ""
-
-    lines = [f"# Research Complete\n"]
+        try:
+            async with asyncio.timeout(300):
+                while True:
+                    msg = await events.recv()
+                    event_type = msg.get("type")
+                    if event_type == "artifact_created":
+                        artifact_count += 1
+                        if len(preview) < 10:
+                            preview.append(msg["data"].get("artifact", msg.get("data", {})))
+                    elif event_type == "research_complete":
+                        summary_text = msg["data"].get("summary", "")
+                        break
+                    elif event_type == "error":
+                        error_message = msg.get("data", {}).get("message", "Unknown error")
+                        break
+        except TimeoutError:
+            logger.warning("Research timed out for project=%s", project_id)
+
+    if error_message is not None:
+        return f"Research failed: {error_message}"
+
+    buf = io.StringIO()
+    w = buf.write
+    w("# Research Complete\n")
     if summary_text:
-        lines.append(f"{summary_text}\n")
-    lines.append(f"**Total artifacts:** {len(artifacts)}\n")
-    for a in artifacts[:10]:
-        lines.append(_format_artifact(a))
-        lines.append("")
+        w(f"\n{summary_text}\n")
+    w(f"\n**Total artifacts:** {artifact_count}\n")
+    for a in preview:
+        w("\n")
+        _write_artifact(a, w)
+        w("\n")
 
-    if len(artifacts) > 10:
-        lines.append(f"_...and {len(artifacts) - 10} more artifacts_")
+    if artifact_count > 10:
+        w(f"\n_...and {artifact_count - 10} more artifacts_")
 
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 @mcp.tool()
@@ -215,38 +379,30 @@ async def get_artifacts(project_id: str, phase: str | None = None) -> str:
         project_id: UUID of the project
         phase: Filter by phase ("research" or "plan")
     """
-    url = _api_url(f"/api/projects/{project_id}/artifacts")
+    url = f"/api/projects/{project_id}/artifacts"
     params = {}
     if phase:
         params["phase"] = phase
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-    artifacts = resp.json()
+    artifacts = await _get_json(url, params=params)
     if not artifacts:
         return "No artifacts found."
-    lines = [f"# Artifacts ({len(artifacts)})\n"]
+    buf = io.StringIO()
+    w = buf.write
+    w(f"# Artifacts ({len(artifacts)})\n")
     for a in artifacts:
-        lines.append(_format_artifact(a))
-        lines.append("")
-    return "\n".join(lines)
+        w("\n")
+        _write_artifact(a, w)
+        w("\n")
+    return buf.getvalue()
 
 
-@mcp.tool()
-async def get_artifact_detail(project_id: str, artifact_id: str) -> str:
-    """Get detailed content for a specific artifact.
-
-    Args:
-        project_id: UUID of the project
-        artifact_id: Short artifact ID (e.g. art_7kx9)
-    """
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(_api_url(f"/api/projects/{project_id}/artifacts"))
-        resp.raise_for_status()
-    artifacts = resp.json()
-    art = next((a for a in artifacts if a["id"] == artifact_id), None)
-    if not art:
-        return f"Artifact `{artifact_id}` not found in project `{project_id}`."
+async def _fetch_artifact_detail(project_id: str, artifact_id: str) -> str:
+    try:
+        art = await _get_json(f"/api/projects/{project_id}/artifacts/{artifact_id}")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return f"Artifact `{artifact_id}` not found in project `{project_id}`."
+        raise
 
     lines = [f"# {art['title']} (`{art['id']}`)\n"]
     lines.append(f"**Type:** {art.get('type', 'unknown')}")
@@ -260,6 +416,34 @@ async def get_artifact_detail(project_id: str, artifact_id: str) -> str:
     return "\n".join(lines)
 
 
+@mcp.tool()
+async def get_artifact_detail(project_id: str, artifact_id: str) -> str:
+    """Get detailed content for a specific artifact.
+
+    Args:
+        project_id: UUID of the project
+        artifact_id: Short artifact ID (e.g. art_7kx9)
+    """
+    return await _fetch_artifact_detail(project_id, artifact_id)
+
+
+@mcp.tool()
+async def get_artifact_details(project_id: str, artifact_ids: list[str]) -> str:
+    """Get detailed content for several artifacts in one call.
+
+    Args:
+        project_id: UUID of the project
+        artifact_ids: Short artifact IDs (e.g. ["art_7kx9", "art_2m4p"])
+    """
+    # Lookups run concurrently over the shared client
+    async with asyncio.TaskGroup() as tg:
+        tasks = [
+            tg.create_task(_fetch_artifact_detail(project_id, aid))
+            for aid in dict.fromkeys(artifact_ids)
+        ]
+    return "\n\n---\n\n".join(t.result() for t in tasks)
+
+
 @mcp.tool()
 async def get_plan_directions(project_id: str) -> str:
     """Get AI-suggested strategic plan directions based on research.
@@ -267,10 +451,7 @@ async def get_plan_directions(project_id: str) -> str:
     Args:
         project_id: UUID of the project (must have research artifacts)
     """
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.get(_api_url(f"/api/projects/{project_id}/plan-directions"))
-        resp.raise_for_status()
-    data = resp.json()
+    data = await _get_json(f"/api/projects/{project_id}/plan-directions", timeout=60)
     directions = data.get("directions", [])
     if not directions:
         return "No plan directions available."
@@ -296,55 +477,49 @@ async def start_plan(
         description: What to build — used as the plan prompt
         ref_ids: Optional list of research artifact IDs to reference
     """
-    ws_url = f"{WS_URL}/ws/projects/{project_id}"
-    collected: list[dict] = []
+    artifacts: list[dict] = []
+    error_message: str | None = None
 
-    async with websockets.connect(ws_url) as ws:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                _api_url(f"/api/projects/{project_id}/plan"),
-                json={
-                    "description": description,
-                    "reference_artifact_ids": ref_ids or [],
-                },
-            )
-            resp.raise_for_status()
-
-        while True:
-            try:
-                raw = await asyncio.wait_for(ws.recv(), timeout=300)
-            except asyncio.TimeoutError:
-                collected.append({"type": "timeout", "data": {"message": "Plan timed out"}})
-                break
-            try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
-                continue
-
-            event_type = msg.get("type", "")
-            collected.append(msg)
-
-            if event_type == "plan_complete":
-                break
-            if event_type == "error":
-                break
-
-    artifacts = [
-        m["data"].get("artifact", m.get("data", {}))
-        for m in collected
-        if m.get("type") == "plan_artifact_created"
-    ]
-    errors = [m for m in collected if m.get("type") == "error"]
-
-    if errors:
-        return f"Plan failed: {errors[0].get('data', {}).get('message', 'Unknown error')}"
-
-    lines = ["# Plan Complete\n"]
-    lines.append(f"**Components:** {len(artifacts)}\n")
+    async with _project_events(project_id) as events:
+        client = _get_client()
+        resp = await client.post(
+            f"/api/projects/{project_id}/plan",
+            content=orjson.dumps({
+                "description": description,
+                "reference_artifact_ids": ref_ids or [],
+            }),
+            headers=_JSON_HEADERS,
+        )
+        resp.raise_for_status()
+
+        try:
+            async with asyncio.timeout(300):
+                while True:
+                    msg = await events.recv()
+                    event_type = msg.get("type")
+                    if event_type == "plan_artifact_created":
+                        artifacts.append(msg["data"].get("artifact", msg.get("data", {})))
+                    elif event_type == "plan_artifacts_created_batch":
+                        artifacts.extend(msg["data"].get("artifacts", []))
+                    elif event_type == "plan_complete":
+                        break
+                    elif event_type == "error":
+                        error_message = msg.get("data", {}).get("message", "Unknown error")
+                        break
+        except TimeoutError:
+            logger.warning("Plan timed out for project=%s", project_id)
+
+    if error_message is not None:
+        return f"Plan failed: {error_message}"
+
+    buf = io.StringIO()
+    w = buf.write
+    w(f"# Plan Complete\n\n**Components:** {len(artifacts)}\n")
     for a in artifacts:
-        lines.append(_format_artifact(a))
-        lines.append("")
-    return "\n".join(lines)
+        w("\n")
+        _write_artifact(a, w)
+        w("\n")
+    return buf.getvalue()
 
 
 @mcp.tool()
@@ -356,17 +531,18 @@ async def give_feedback(project_id: str, artifact_id: str, comment: str) -> str:
         artifact_id: Short artifact ID (e.g. art_7kx9)
         comment: Your feedback comment
     """
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            _api_url(f"/api/projects/{project_id}/feedback"),
-            json={
-                "artifact_id": artifact_id,
-                "comment": comment,
-                "source": "human",
-                "author": "Claude Code",
-            },
-        )
-        resp.raise_for_status()
+    client = _get_client()
+    resp = await client.post(
+        f"/api/projects/{project_id}/feedback",
+        content=orjson.dumps({
+            "artifact_id": artifact_id,
+            "comment": comment,
+            "source": "human",
+            "author": "Claude Code",
+        }),
+        headers=_JSON_HEADERS,
+    )
+    resp.raise_for_status()
     return f"Feedback submitted for artifact `{artifact_id}`."
 
 
@@ -378,24 +554,22 @@ async def export_plan(project_id: str, output_path: str | None = None) -> str:
         project_id: UUID of the project
         output_path: File path to write (defaults to PLAN.md in current directory)
     """
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.get(_api_url(f"/api/projects/{project_id}/export"))
-        resp.raise_for_status()
-    data = resp.json()
+    data = await _get_json(f"/api/projects/{project_id}/export")
     markdown = data["markdown"]
 
     dest = Path(output_path) if output_path else Path.cwd() / "PLAN.md"
-    dest.write_text(markdown, encoding="utf-8")
+    dest.write_bytes(markdown.encode("utf-8"))
 
-    # Build a preview: first 20 lines
-    preview_lines = markdown.split("\n")[:20]
-    preview = "\n".join(preview_lines)
+    # Build a preview: first 20 lines. maxsplit leaves the tail unsplit, and
+    # the total comes from a count rather than a full split.
+    preview = "\n".join(markdown.split("\n", 20)[:20])
+    line_count = markdown.count("\n") + 1
 
     lines = [f"Plan exported to `{dest}`\n"]
     lines.append("**Preview:**\n")
     lines.append(f"```markdown\n{preview}\n```")
-    if len(markdown.split("\n")) > 20:
-        lines.append(f"\n_...{len(markdown.split(chr(10))) - 20} more lines_")
+    if line_count > 20:
+        lines.append(f"\n_...{line_count - 20} more lines_")
     return "\n".join(lines)
 
 
@@ -407,7 +581,8 @@ async def open_in_browser(project_id: str) -> str:
         project_id: UUID of the project
     """
     url = f"{FRONTEND_URL}?project={project_id}"
-    webbrowser.open(url)
+    # Launching a browser can block for a while; keep the event loop free
+    await asyncio.get_running_loop().run_in_executor(None, webbrowser.open, url)
     return f"Opened project in browser: {url}"
 
 
@@ -225,9 +225,13 @@ export class ProjectWebSocket {
 
     this.ws.on("message", (raw: WebSocket.Data) => {
       try {
-        const msg = JSON.parse(raw.toString()) as WSEvent;
-        for (const listener of this.listeners) {
-          listener(msg);
+        const msg = JSON.parse(raw.toString());
+        // Buffered events are replayed on connect as one bundled frame
+        const events: WSEvent[] = msg.type === "replay" ? msg.data : [msg];
+        for (const event of events) {
+          for (const listener of this.listeners) {
+            listener(event);
+          }
         }
       } catch {
         // ignore parse errors
@@ -163,6 +163,26 @@ export class ProgressTracker {
         op.lastMessage = `Mapping ${op.connectionCount} connection${op.connectionCount > 1 ? "s" : ""}...`;
         break;
 
+      case "plan_artifacts_created_batch": {
+        const artifacts = (data.artifacts as Record<string, unknown>[]) || [];
+        for (const artifact of artifacts) {
+          op.planArtifacts.push({
+            title: (artifact.title as string) || "",
+            type: (artifact.type as string) || "component",
+          });
+        }
+        op.artifactCount += artifacts.length;
+        op.lastMessage = this.buildPlanProgressMessage(op);
+        break;
+      }
+
+      case "connections_created_batch": {
+        const count = ((data.connections as unknown[]) || []).length;
+        op.connectionCount = (op.connectionCount || 0) + count;
+        op.lastMessage = `Mapping ${op.connectionCount} connection${op.connectionCount > 1 ? "s" : ""}...`;
+        break;
+      }
+
       case "agent_complete":
         op.agentComplete++;
         op.lastMessage = `Agent ${op.agentComplete}/${op.agentTotal || "?"} complete (${op.artifactCount} artifacts)`;
@@ -194,6 +214,19 @@ export class ProgressTracker {
         }
         break;
 
+      case "images_updated_batch": {
+        const count = ((data.images as unknown[]) || []).length;
+        if (op.imageProgress) {
+          op.imageProgress.completed += count;
+        }
+        if (op.type === "plan") {
+          op.lastMessage = this.buildPlanProgressMessage(op);
+        } else {
+          op.lastMessage = `${count} image${count === 1 ? "" : "s"} generated`;
+        }
+        break;
+      }
+
       case "images_complete":
         if (op.type === "plan") {
           if (op.imageProgress) {
@@ -128,9 +128,12 @@ export type WSEventType =
   | "agent_complete"
   | "research_complete"
   | "plan_artifact_created"
+  | "plan_artifacts_created_batch"
+  | "connections_created_batch"
   | "plan_complete"
   | "images_generating"
   | "image_generated"
+  | "images_updated_batch"
   | "artifact_updated"
   | "feedback_addressed"
   | "batch_regenerate_start"
@@ -195,6 +195,26 @@ export const useExtensionStore = create<ExtensionStore>((set, get) => ({
         break;
       }
 
+      case "plan_artifacts_created_batch": {
+        const incoming = (data.artifacts as Artifact[]) || [];
+        set((s) => {
+          const seen = new Set(s.artifacts.map((a) => a.id));
+          const fresh = incoming.filter((a) => !seen.has(a.id));
+          return fresh.length ? { artifacts: [...s.artifacts, ...fresh] } : s;
+        });
+        break;
+      }
+
+      case "connections_created_batch": {
+        const incoming = (data.connections as ArtifactConnection[]) || [];
+        set((s) => {
+          const seen = new Set(s.connections.map((c) => c.id));
+          const fresh = incoming.filter((c) => c.id && !seen.has(c.id));
+          return fresh.length ? { connections: [...s.connections, ...fresh] } : s;
+        });
+        break;
+      }
+
       case "group_created": {
         const group = data.group as Group;
         if (group) {
@@ -242,6 +262,20 @@ export const useExtensionStore = create<ExtensionStore>((set, get) => ({
         break;
       }
 
+      case "images_updated_batch": {
+        const images = (data.images as { artifact_id: string; image_url: string }[]) || [];
+        const urls = new Map(images.map((i) => [i.artifact_id, i.image_url]));
+        set((s) => ({
+          artifacts: s.artifacts.map((a) =>
+            urls.has(a.id) ? { ...a, image_url: urls.get(a.id) } : a
+          ),
+          imageGenerationProgress: s.imageGenerationProgress
+            ? { ...s.imageGenerationProgress, completed: s.imageGenerationProgress.completed + images.length }
+            : null,
+        }));
+        break;
+      }
+
       case "artifact_updated": {
         const artifact = data.artifact as Artifact;
         if (artifact) {
@@ -118,7 +118,9 @@ export type WSEventType =
   | "agent_started" | "agent_thinking" | "artifact_created"
   | "connection_created" | "group_created" | "agent_complete"
   | "research_complete" | "plan_artifact_created" | "plan_complete"
+  | "plan_artifacts_created_batch" | "connections_created_batch"
   | "images_generating" | "image_generated" | "artifact_updated"
+  | "images_updated_batch"
   | "feedback_addressed" | "batch_regenerate_start"
   | "batch_regenerate_progress" | "batch_regenerate_complete"
   | "plan_directions_ready" | "research_directions_planned"